@@ -1,5 +1,8 @@
 # Used by both HashMaps (SC & OA)
 
+from array import array
+
+
 class DynamicArrayException(Exception):
     pass
 
@@ -8,26 +11,36 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, length, raw, filled, iterator
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
 
+    @classmethod
+    def filled(cls, length: int, value: object = None) -> "DynamicArray":
+        """Return a new array of the given length with every element set to value."""
+        array = cls()
+        array._data = [value] * length
+        return array
+
     def __iter__(self):
+        """Return an iterator over the elements of the array."""
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        """Return length of array."""
+        return len(self._data)
+
+    def raw(self) -> list:
         """
-        Disable iterator capability for DynamicArray class
-        This means loops and aggregate functions like
-        those shown below won't work:
-
-        da = DynamicArray()
-        for value in da:        # will not work
-        min(da)                 # will not work
-        max(da)                 # will not work
-        sort(da)                # will not work
+        Return the underlying list for unchecked indexing on hot paths.
+        The list stays shared with the array, so writes to it are writes to the array.
         """
-        return None
+        return self._data
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -88,6 +101,115 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+def as_list(items) -> list:
+    """Return the items of a DynamicArray or any other iterable as a list"""
+    if isinstance(items, DynamicArray):
+        return items.raw()
+    if isinstance(items, list):
+        return items
+    return list(items)
+
+
+def sized_pairs(pairs, expected_size: int = None) -> tuple:
+    """
+    Return (pairs, count) for a bulk load. When no expected_size is given
+    and pairs has no length, the pairs are collected into a list so they can be counted.
+    """
+    if expected_size is None and not hasattr(pairs, '__len__'):
+        pairs = list(pairs)
+    if expected_size is None:
+        expected_size = len(pairs)
+    return pairs, expected_size
+
+
+# 2^64 divided by the golden ratio, the multiplier used by Fibonacci hashing
+FIBONACCI_MULTIPLIER = 0x9E3779B97F4A7C15
+
+# capacity policies accepted by both HashMaps
+CAPACITY_POLICIES = ('prime', 'power_of_two')
+
+
+def next_power_of_two(capacity: int) -> int:
+    """Return the smallest power of two greater than or equal to capacity"""
+    if capacity <= 1:
+        return 1
+    return 1 << (capacity - 1).bit_length()
+
+
+def modulo_index(hash: int, capacity: int) -> int:
+    """Map a hash to a bucket of a prime capacity table"""
+    return hash % capacity
+
+
+def fibonacci_index(hash: int, capacity: int) -> int:
+    """
+    Map a hash to a bucket of a power of two capacity table.
+    The hash is scrambled by Fibonacci hashing before masking, so weak hash
+    functions whose low bits barely vary still spread over all buckets.
+    """
+    return (hash * FIBONACCI_MULTIPLIER >> (65 - capacity.bit_length())) & (capacity - 1)
+
+
+# ----------------- Lazy views for both HashMaps ------------------ #
+
+class KeysView:
+    """
+    Lazy view of the keys of a hash map. Iterating streams the keys straight
+    from the map's buckets; nothing is copied.
+    """
+
+    __slots__ = ('_map',)
+
+    def __init__(self, hash_map) -> None:
+        """Initialize a view of hash_map."""
+        self._map = hash_map
+
+    def __iter__(self):
+        """Return a new iterator over the keys."""
+        return self._map._iterator('keys')
+
+    def __len__(self) -> int:
+        """Return number of keys in the map."""
+        return self._map.get_size()
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if key is in the map."""
+        return self._map.contains_key(key)
+
+
+class ValuesView(KeysView):
+    """
+    Lazy view of the values of a hash map
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Return a new iterator over the values."""
+        return self._map._iterator('values')
+
+    def __contains__(self, value: object) -> bool:
+        """Return True if some key maps to value (scans the map)."""
+        return any(stored == value for stored in self)
+
+
+class ItemsView(KeysView):
+    """
+    Lazy view of the (key, value) pairs of a hash map
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Return a new iterator over the (key, value) pairs."""
+        return self._map._iterator('items')
+
+    def __contains__(self, item: tuple) -> bool:
+        """Return True if item is a (key, value) pair of the map."""
+        key, value = item
+        return self._map.contains_key(key) and self._map.get(key) == value
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -95,11 +217,18 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        The full (pre-modulo) hash of the key is cached so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -111,6 +240,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -133,9 +264,11 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, pop, contains, length, head, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -160,35 +293,52 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node at front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If the key's hash is given, stored hashes are compared before the keys.
         Return True if removal was successful, False otherwise.
         """
+        return self.pop(key, hash) is not None
+
+    def pop(self, key: str, hash: int = None) -> SLNode:
+        """
+        Remove and return the first node with matching key, or None if no match.
+        If the key's hash is given, stored hashes are compared before the keys.
+        """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If the key's hash is given, stored hashes are compared before the keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
@@ -197,19 +347,250 @@ class LinkedList:
         """Return the length of the list."""
         return self._size
 
+    def head(self) -> SLNode:
+        """Return the first node of the list, or None if the list is empty."""
+        return self._head
+
 
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
         self.value = value
 
+        # Full (pre-modulo) hash of the key, reused when probing and resizing
+        self.hash = hash
+
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+# Sentinel hash values marking bucket state. Stored hashes are masked to
+# 63 bits (HASH_MASK), so they are never negative and cannot collide with these.
+EMPTY = -1
+TOMBSTONE = -2
+HASH_MASK = (1 << 63) - 1
+
+# shared tombstone left behind by EntryStorage.discard
+_DISCARDED = HashEntry(None, None)
+_DISCARDED.is_tombstone = True
+
+
+class EntryStorage:
+    """
+    Open addressing bucket storage holding one HashEntry object per used bucket
+    inside a DynamicArray. Empty buckets are None.
+    Supported methods are:
+    hash_at, key_at, value_at, set_value, store, delete, discard, clear_at, move,
+    entry_at, get_buckets, length
+    """
+
+    __slots__ = ('_buckets', '_data')
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize capacity empty buckets."""
+        self._buckets = DynamicArray.filled(capacity)
+        # unchecked view of the buckets for the accessors below
+        self._data = self._buckets.raw()
+
+    def hash_at(self, index: int) -> int:
+        """Return the hash stored at index, or EMPTY / TOMBSTONE."""
+        entry = self._data[index]
+        if entry is None:
+            return EMPTY
+        if entry.is_tombstone:
+            return TOMBSTONE
+        return entry.hash
+
+    def key_at(self, index: int) -> object:
+        """Return the key stored at index."""
+        return self._data[index].key
+
+    def value_at(self, index: int) -> object:
+        """Return the value stored at index."""
+        return self._data[index].value
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value stored at index."""
+        self._data[index].value = value
+
+    def store(self, index: int, hash: int, key: object, value: object) -> None:
+        """Store a new entry at index."""
+        self._data[index] = HashEntry(key, value, hash)
+
+    def delete(self, index: int) -> None:
+        """Turn the entry at index into a tombstone."""
+        self._data[index].is_tombstone = True
+
+    def discard(self, index: int) -> None:
+        """Turn index into a tombstone that keeps no reference to the entry."""
+        self._data[index] = _DISCARDED
+
+    def clear_at(self, index: int) -> None:
+        """Make the bucket at index empty."""
+        self._data[index] = None
+
+    def move(self, source: int, target: int) -> None:
+        """Move the entry at source to target, leaving source empty."""
+        self._data[target] = self._data[source]
+        self._data[source] = None
+
+    def entry_at(self, index: int) -> HashEntry:
+        """Return the HashEntry at index, or None if the bucket is empty."""
+        return self._data[index]
+
+    def get_buckets(self) -> DynamicArray:
+        """Return the underlying array of entries."""
+        return self._buckets
+
+    def length(self) -> int:
+        """Return the number of buckets."""
+        return len(self._data)
+
+
+class ArrayStorage:
+    """
+    Struct-of-arrays open addressing bucket storage: hashes live in a compact
+    array('q') column, keys and values in parallel lists. Empty buckets and
+    tombstones are encoded as the EMPTY and TOMBSTONE sentinel hashes,
+    so no per-entry objects are allocated.
+    Supported methods are the same as EntryStorage.
+    """
+
+    __slots__ = ('_hashes', '_keys', '_values')
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize capacity empty buckets."""
+        self._hashes = array('q', [EMPTY]) * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def hash_at(self, index: int) -> int:
+        """Return the hash stored at index, or EMPTY / TOMBSTONE."""
+        return self._hashes[index]
+
+    def key_at(self, index: int) -> object:
+        """Return the key stored at index."""
+        return self._keys[index]
+
+    def value_at(self, index: int) -> object:
+        """Return the value stored at index."""
+        return self._values[index]
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value stored at index."""
+        self._values[index] = value
+
+    def store(self, index: int, hash: int, key: object, value: object) -> None:
+        """Store a new entry at index."""
+        self._hashes[index] = hash
+        self._keys[index] = key
+        self._values[index] = value
+
+    def delete(self, index: int) -> None:
+        """Mark index as a tombstone and release its key and value."""
+        self._hashes[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+
+    # tombstones already release their key and value
+    discard = delete
+
+    def clear_at(self, index: int) -> None:
+        """Make the bucket at index empty."""
+        self._hashes[index] = EMPTY
+        self._keys[index] = None
+        self._values[index] = None
+
+    def move(self, source: int, target: int) -> None:
+        """Move the entry at source to target, leaving source empty."""
+        self._hashes[target] = self._hashes[source]
+        self._keys[target] = self._keys[source]
+        self._values[target] = self._values[source]
+        self._hashes[source] = EMPTY
+        self._keys[source] = None
+        self._values[source] = None
+
+    def entry_at(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of the bucket at index, or None if it is empty."""
+        hash = self._hashes[index]
+        if hash == EMPTY:
+            return None
+        entry = HashEntry(self._keys[index], self._values[index], hash)
+        entry.is_tombstone = hash == TOMBSTONE
+        return entry
+
+    def get_buckets(self) -> DynamicArray:
+        """Return a DynamicArray of HashEntry copies of the buckets."""
+        return DynamicArray([self.entry_at(index) for index in range(len(self._hashes))])
+
+    def length(self) -> int:
+        """Return the number of buckets."""
+        return len(self._hashes)
+
+
+class IntArrayStorage(ArrayStorage):
+    """
+    ArrayStorage whose keys are ints stored in an array('q') column as well,
+    so neither entries nor keys are boxed Python objects; only values are.
+    Keys must fit in a signed 64 bit integer, otherwise store raises OverflowError.
+    Empty buckets and tombstones keep a key of 0.
+    Supported methods are the same as EntryStorage.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize capacity empty buckets."""
+        self._hashes = array('q', [EMPTY]) * capacity
+        self._keys = array('q', [0]) * capacity
+        self._values = [None] * capacity
+
+    def store(self, index: int, hash: int, key: int, value: object) -> None:
+        """Store a new entry at index. The key goes first, so a key out of range changes nothing."""
+        self._keys[index] = key
+        self._hashes[index] = hash
+        self._values[index] = value
+
+    def delete(self, index: int) -> None:
+        """Mark index as a tombstone and release its value."""
+        self._hashes[index] = TOMBSTONE
+        self._keys[index] = 0
+        self._values[index] = None
+
+    discard = delete
+
+    def columns(self) -> tuple:
+        """Return the (hashes, keys, values) columns, for callers that walk the buckets themselves."""
+        return self._hashes, self._keys, self._values
+
+    def entry_at(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of the bucket at index, or None if it is empty."""
+        entry = super().entry_at(index)
+        if entry is not None and entry.is_tombstone:
+            entry.key = None
+        return entry
+
+    def clear_at(self, index: int) -> None:
+        """Make the bucket at index empty."""
+        self._hashes[index] = EMPTY
+        self._keys[index] = 0
+        self._values[index] = None
+
+    def move(self, source: int, target: int) -> None:
+        """Move the entry at source to target, leaving source empty."""
+        self._hashes[target] = self._hashes[source]
+        self._keys[target] = self._keys[source]
+        self._values[target] = self._values[source]
+        self._hashes[source] = EMPTY
+        self._keys[source] = 0
+        self._values[source] = None
@@ -0,0 +1,400 @@
+# Description: An asyncio front end for the HashMaps that keeps whole table work from stalling the event loop.
+
+import asyncio
+
+import concurrent_hash_map
+import hash_map_oa
+import hash_map_sc
+from bulk_hash import batched
+from DS_include import DynamicArray, LinkedList, EMPTY, sized_pairs, hash_function_2
+
+# maps whose reads never change the table, so it can be rebuilt in a worker thread meanwhile
+OFFLOAD_TYPES = (hash_map_oa.HashMap, hash_map_oa.IntHashMap, hash_map_sc.HashMap)
+
+# maps whose lookups ignore the old table of an incremental resize, so their
+# resizes cannot be driven a batch at a time
+BLOCKING_TYPES = (concurrent_hash_map.ConcurrentHashMap,)
+
+# overlay value of a key removed while an offloaded resize runs
+_REMOVED = object()
+
+
+class AsyncHashMap:
+    """
+    asyncio front end for an open addressing or separate chaining HashMap.
+    resize, put_many, clear, get_keys_and_values and iteration (async for over
+    items, keys or values) are coroutines that hand control back to the event loop
+    every batch buckets (pairs for put_many), so the loop is never stalled for
+    more than one batch. get, contains_key, put and remove are plain calls and can
+    be made by other tasks in between. One resize, put_many or clear runs at a time.
+    With offload a resize rebuilds the table in a worker thread instead. The table
+    is left as it is until then and keeps serving reads, while writes go to an
+    overlay that is replayed onto the new table when it is handed back.
+    """
+
+    def __init__(self, hash_map, batch: int = 1024, offload: bool = False, executor=None) -> None:
+        """
+        Initialize the front end around hash_map, which should only be used through it.
+        executor runs offloaded resizes, the loop's default executor if None.
+        Offloading needs a plain, uninstrumented map from OFFLOAD_TYPES.
+        Maps from BLOCKING_TYPES are refused, as resize could not hand control back.
+        """
+        if batch < 1:
+            raise ValueError("batch must be at least 1")
+        if isinstance(hash_map, BLOCKING_TYPES):
+            raise ValueError(f"a {type(hash_map).__name__} cannot be resized a batch at a time")
+        self._map = hash_map
+        self._batch = batch
+        self._executor = executor
+        self._offload = offload
+        if offload:
+            self._check_offload()
+        self._lock = asyncio.Lock()
+
+        # writes made while an offloaded resize runs, None otherwise,
+        # and how much they changed the size of the map by
+        self._overlay = None
+        self._size_delta = 0
+
+    def get_map(self):
+        """
+        Return the wrapped hash map
+        """
+        return self._map
+
+    def get_batch(self) -> int:
+        """
+        Return number of buckets handled between two hand offs to the event loop
+        """
+        return self._batch
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size() + self._size_delta
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._map.get_capacity()
+
+    def is_offloading(self) -> bool:
+        """
+        Return True while an offloaded resize is rebuilding the table
+        """
+        return self._overlay is not None
+
+    def _check_offload(self) -> None:
+        """Helper function raising ValueError if the map cannot be rebuilt in a worker thread."""
+        if type(self._map) not in OFFLOAD_TYPES:
+            raise ValueError(f"a {type(self._map).__name__} cannot be resized in a worker thread")
+        if self._map._stats is not None:
+            raise ValueError("an instrumented map cannot be resized in a worker thread")
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: object) -> object:
+        """
+        Returns the value related to key, or None if it is not in the map
+        """
+        overlay = self._overlay
+        if overlay is not None and key in overlay:
+            value = overlay[key]
+            return None if value is _REMOVED else value
+        return self._map.get(key)
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Returns True if key is in the map
+        """
+        overlay = self._overlay
+        if overlay is not None and key in overlay:
+            return overlay[key] is not _REMOVED
+        return self._map.contains_key(key)
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Adds the key:value pair to the map, replacing the value of a key already in it
+        """
+        overlay = self._overlay
+        if overlay is None:
+            self._map.put(key, value)
+            return
+        if not self.contains_key(key):
+            self._size_delta += 1
+        overlay[key] = value
+
+    def remove(self, key: object) -> None:
+        """
+        Removes key from the map if it is there
+        """
+        overlay = self._overlay
+        if overlay is None:
+            self._map.remove(key)
+            return
+        if self.contains_key(key):
+            self._size_delta -= 1
+            overlay[key] = _REMOVED
+
+    # ------------------------------------------------------------------ #
+
+    async def _drain(self) -> None:
+        """Helper function to finish an incremental resize in progress, a batch of buckets at a time."""
+        hash_map = self._map
+        while hash_map.is_resizing():
+            hash_map._migrate(self._batch)
+            await asyncio.sleep(0)
+
+    async def _empty_buckets(self, capacity: int) -> DynamicArray:
+        """
+        Helper function returning capacity empty buckets for a separate chaining map,
+        allocated a batch at a time unless the map keeps empty buckets as None
+        """
+        if self._map._lazy_buckets:
+            return self._map._new_buckets(capacity)
+        buckets, batch = [], self._batch
+        for start in range(0, capacity, batch):
+            buckets.extend(LinkedList() for _ in range(min(batch, capacity - start)))
+            await asyncio.sleep(0)
+        return DynamicArray(buckets)
+
+    def _table(self) -> object:
+        """Helper function returning the storage or bucket list the map currently uses."""
+        hash_map = self._map
+        if isinstance(hash_map, hash_map_oa.HashMap):
+            return hash_map._storage
+        return hash_map._bucket_list
+
+    async def _release(self, table: object) -> None:
+        """
+        Helper function dropping the entries of a table returned by _table that the map
+        no longer uses, a batch of buckets at a time rather than all at once
+        """
+        batch = self._batch
+        if isinstance(table, list):
+            for start in range(0, len(table), batch):
+                end = min(start + batch, len(table))
+                table[start:end] = [None] * (end - start)
+                await asyncio.sleep(0)
+            return
+
+        hash_at, clear_at, length = table.hash_at, table.clear_at, table.length()
+        for start in range(0, length, batch):
+            for index in range(start, min(start + batch, length)):
+                if hash_at(index) != EMPTY:
+                    clear_at(index)
+            await asyncio.sleep(0)
+
+    async def _rebuild(self, new_capacity: int, offload: bool) -> None:
+        """
+        Helper function to move the entries into new_capacity buckets, adjusted by the map,
+        dropping the tombstones of an open addressing map: through an incremental resize
+        driven a batch of buckets at a time, or in a worker thread
+        """
+        hash_map = self._map
+        await self._drain()
+        if not offload:
+            if isinstance(hash_map, hash_map_oa.HashMap):
+                hash_map._start_resize(hash_map._valid_capacity(new_capacity))
+            else:
+                capacity = hash_map._valid_capacity(new_capacity)
+                hash_map._start_resize(capacity, await self._empty_buckets(capacity))
+            await self._drain()
+            return
+
+        version, old = hash_map._version, self._table()
+        self._overlay, self._size_delta = {}, 0
+        table = None
+        try:
+            table = await asyncio.get_running_loop().run_in_executor(
+                self._executor, hash_map._rebuilt, hash_map._valid_capacity(new_capacity))
+        finally:
+            overlay = self._overlay
+            self._overlay, self._size_delta = None, 0
+            changed = hash_map._version != version
+            if table is not None and not changed:
+                hash_map._install(table)
+            # the writes made meanwhile are kept whether or not the new table made it
+            for key, value in overlay.items():
+                if value is _REMOVED:
+                    hash_map.remove(key)
+                else:
+                    hash_map.put(key, value)
+        if changed:
+            raise RuntimeError("hash map changed during an offloaded resize")
+        await self._release(old)
+
+    def _needs_compaction(self, needed: int, capacity: int) -> bool:
+        """
+        Helper function telling whether an open addressing map would be compacted
+        before needed keys fit in capacity buckets
+        """
+        hash_map = self._map
+        if not isinstance(hash_map, hash_map_oa.HashMap):
+            return False
+        return needed + hash_map.get_tombstones() >= hash_map._compact_threshold * capacity
+
+    async def resize(self, new_capacity: int, offload: bool = None) -> None:
+        """
+        Resizes the table to new_capacity buckets, raised the way the map's resize_table
+        raises it if needed. Does nothing if new_capacity is under the number of keys.
+        offload overrides, for this call, whether the table is rebuilt in a worker thread.
+        """
+        if offload is None:
+            offload = self._offload
+        elif offload:
+            self._check_offload()
+        async with self._lock:
+            if new_capacity < max(1, self._map.get_size()):
+                return
+            await self._rebuild(new_capacity, offload)
+
+    async def put_many(self, pairs, expected_size: int = None) -> None:
+        """
+        Adds every key:value pair from an iterable of pairs, batch pairs at a time.
+        The table is sized for expected_size new keys (the number of pairs by default)
+        up front, as resize would, so the pairs do not trigger a blocking resize.
+        """
+        pairs, expected_size = sized_pairs(pairs, expected_size)
+        async with self._lock:
+            hash_map = self._map
+            await self._drain()
+            needed = hash_map.get_size() + expected_size
+            capacity = max(hash_map._valid_capacity(hash_map.get_load_policy().capacity_for(needed)),
+                           hash_map.get_capacity())
+            if capacity > hash_map.get_capacity() or self._needs_compaction(needed, capacity):
+                await self._rebuild(capacity, self._offload)
+
+            for batch in batched(pairs, self._batch):
+                hash_map.put_many(batch, len(batch))
+                await asyncio.sleep(0)
+
+    async def clear(self) -> None:
+        """
+        Clears the contents of the map. Capacity is not changed. The old entries are
+        released afterwards, a batch of buckets at a time. A separate chaining map
+        without lazy_buckets still allocates its new empty buckets all at once.
+        """
+        async with self._lock:
+            await self._drain()
+            # hold on to the old table, so clear does not free every entry at once
+            old = self._table()
+            self._map.clear()
+            await self._release(old)
+
+    async def _slices(self):
+        """
+        Helper async generator yielding the (key, value) pairs of the map in lists,
+        one per batch of buckets. Raises RuntimeError if the map is changed
+        structurally before it is done.
+        """
+        hash_map = self._map
+        async with self._lock:
+            await self._drain()
+        version, capacity, batch = hash_map._version, hash_map.get_capacity(), self._batch
+        for start in range(0, capacity, batch):
+            if hash_map._version != version:
+                raise RuntimeError("hash map changed during iteration")
+            yield hash_map._items_in(start, min(start + batch, capacity))
+            await asyncio.sleep(0)
+
+    async def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns an array that lists all key:value pairs stored in the map as tuples.
+        Array is unordered. Raises RuntimeError if the map is changed structurally meanwhile.
+        """
+        result = DynamicArray()
+        async for pairs in self._slices():
+            for pair in pairs:
+                result.append(pair)
+        return result
+
+    async def items(self):
+        """
+        Yield the key:value pairs of the map as (key, value) tuples.
+        Raises RuntimeError if the map is changed structurally while iterating.
+        """
+        async for pairs in self._slices():
+            for pair in pairs:
+                yield pair
+
+    async def keys(self):
+        """
+        Yield the keys of the map
+        """
+        async for pairs in self._slices():
+            for key, _ in pairs:
+                yield key
+
+    async def values(self):
+        """
+        Yield the values of the map
+        """
+        async for pairs in self._slices():
+            for _, value in pairs:
+                yield value
+
+    def __aiter__(self):
+        """
+        Create asynchronous iterator over the (key, value) pairs of the map
+        """
+        return self.items()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from bounded_cache import BoundedCache
+
+    async def main() -> None:
+        for hash_map in (hash_map_oa.HashMap(11, hash_function_2), hash_map_sc.HashMap(11, hash_function_2)):
+            print(f"\n{type(hash_map).__module__}")
+            print("-----------------")
+            amap = AsyncHashMap(hash_map, batch=16)
+            await amap.put_many(('key' + str(i), i) for i in range(100))
+            print(amap.get_size(), amap.get_capacity(), amap.get('key42'))
+
+            await amap.resize(1000)
+            print(amap.get_size(), amap.get_capacity(), amap.contains_key('key99'))
+
+            # writes made while the worker thread rebuilds the table are kept
+            task = asyncio.create_task(amap.resize(4000, offload=True))
+            await asyncio.sleep(0)
+            amap.put('late', 'value')
+            amap.remove('key0')
+            print(amap.is_offloading(), amap.get_size(), amap.get('late'), amap.get('key0'))
+            await task
+            print(amap.is_offloading(), amap.get_size(), amap.get_capacity(), amap.get('late'))
+
+            total = 0
+            async for key, value in amap:
+                total += value if key != 'late' else 0
+            print(total, (await amap.get_keys_and_values()).length())
+
+            await amap.clear()
+            print(amap.get_size(), amap.get_capacity())
+
+        # a full cache keeps every put while it is resized a batch at a time,
+        # though each put evicts an entry and moves buckets to the new table
+        print("\nbounded_cache")
+        print("-----------------")
+        cache = BoundedCache(11, hash_function_2, max_entries=500)
+        amap = AsyncHashMap(cache, batch=4)
+        for i in range(500):
+            amap.put('old' + str(i), i)
+        task = asyncio.create_task(amap.resize(2000))
+        added = 0
+        while not task.done():
+            for _ in range(4):
+                amap.put('new' + str(added), added)
+                added += 1
+            await asyncio.sleep(0)
+        await task
+        cache.check_counters()
+        # the last 500 puts are the entries left
+        print(cache.get_size(), all(amap.get('new' + str(i)) == i for i in range(added - 500, added)))
+
+    asyncio.run(main())
@@ -0,0 +1,819 @@
+# Description: Timing benchmarks for the SC and OA hash maps.
+
+import asyncio
+import gc
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import bulk_hash
+import hash_map_oa
+import hash_map_sc
+from async_hash_map import AsyncHashMap
+from bounded_cache import BoundedCache
+from concurrent_hash_map import ConcurrentHashMap
+from frequency import parallel_find_mode
+from DS_include import DynamicArray, hash_function_1, hash_function_2
+from expiring_map import ExpiringHashMapOA, ExpiringHashMapSC
+from hash_functions import SeededHash, fnv1a_64
+from load_policy import LoadPolicy
+
+
+def _best_of(setup, func, repeat: int = 3) -> float:
+    """
+    Run func on a fresh result of setup repeat times and return the fastest wall time in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        subject = setup()
+        start = time.perf_counter()
+        func(subject)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _rehash_with_put(hash_map) -> None:
+    """
+    Rebuild the table the way resize_table used to: by calling put for every key,
+    which runs the hash function on each key again
+    """
+    pairs = hash_map.get_keys_and_values()
+    rebuilt = type(hash_map)(hash_map.get_capacity() * 2, hash_map._hash_function)
+    for index in range(pairs.length()):
+        key, value = pairs[index]
+        rebuilt.put(key, value)
+
+
+def bench_resize(n: int = 20000, key_length: int = 64) -> None:
+    """
+    Compare doubling a full table with cached hashes (resize_table)
+    against rehashing every key through put
+    """
+    print(f"\nresize_table: {n} keys of length {key_length}")
+    print("--------------------------------------")
+    padding = 'x' * key_length
+    for module in (hash_map_oa, hash_map_sc):
+        for function in (hash_function_1, hash_function_2):
+            def setup():
+                hash_map = module.HashMap(n, function)
+                for i in range(n):
+                    hash_map.put(padding[len(str(i)):] + str(i), i)
+                return hash_map
+
+            before = _best_of(setup, _rehash_with_put)
+            after = _best_of(setup, lambda hash_map: hash_map.resize_table(hash_map.get_capacity() * 2))
+            print(f"{module.__name__:12} {function.__name__:16} "
+                  f"put-rehash {before * 1000:8.1f} ms   cached {after * 1000:8.1f} ms   "
+                  f"x{before / after:.1f}")
+
+
+def bench_storage(n: int = 10000) -> None:
+    """
+    Compare memory per entry and lookup speed of the OA storage engines
+    """
+    print(f"\nOA storage engines: {n} keys")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    for storage in hash_map_oa.STORAGE_ENGINES:
+        tracemalloc.start()
+        hash_map = hash_map_oa.HashMap(n * 2, hash_function_2, storage=storage)
+        for i, key in enumerate(keys):
+            hash_map.put(key, i)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        def lookups(subject):
+            for key in keys:
+                subject.get(key)
+
+        elapsed = _best_of(lambda: hash_map, lookups)
+        print(f"{storage:6} {memory / n:7.1f} bytes/entry   "
+              f"get {n / elapsed / 1000:8.1f} k ops/s")
+
+
+def bench_probing(n: int = 2000) -> None:
+    """
+    Compare put and get throughput of the OA probing strategies
+    """
+    print(f"\nOA probing strategies: {n} keys")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    for function in (hash_function_1, hash_function_2):
+        for probing in hash_map_oa.PROBING_STRATEGIES:
+            def puts(subject):
+                for i, key in enumerate(keys):
+                    subject.put(key, i)
+
+            def gets(subject):
+                for key in keys:
+                    subject.get(key)
+
+            def setup():
+                hash_map = hash_map_oa.HashMap(11, function, probing=probing)
+                puts(hash_map)
+                return hash_map
+
+            put_time = _best_of(lambda: hash_map_oa.HashMap(11, function, probing=probing), puts)
+            get_time = _best_of(setup, gets)
+            print(f"{function.__name__:16} {probing:11} put {n / put_time / 1000:8.1f} k ops/s   "
+                  f"get {n / get_time / 1000:8.1f} k ops/s")
+
+
+def bench_capacity_policy(n: int = 5000) -> None:
+    """
+    Compare prime and power of two capacities: filling a table from a small
+    capacity (several resizes) and looking every key up again
+    """
+    print(f"\ncapacity policies: {n} keys")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        for function in (hash_function_1, hash_function_2):
+            for policy in ('prime', 'power_of_two'):
+                def puts(subject):
+                    for i, key in enumerate(keys):
+                        subject.put(key, i)
+
+                def gets(subject):
+                    for key in keys:
+                        subject.get(key)
+
+                def setup():
+                    hash_map = module.HashMap(11, function, capacity_policy=policy)
+                    puts(hash_map)
+                    return hash_map
+
+                put_time = _best_of(lambda: module.HashMap(11, function, capacity_policy=policy), puts)
+                get_time = _best_of(setup, gets)
+                print(f"{module.__name__:12} {function.__name__:16} {policy:12} "
+                      f"put {n / put_time / 1000:8.1f} k ops/s   get {n / get_time / 1000:8.1f} k ops/s")
+
+
+def bench_bulk_load(n: int = 20000) -> None:
+    """
+    Compare loading n pairs with repeated put calls against from_pairs
+    """
+    print(f"\nbulk load: {n} pairs")
+    print("--------------------------------------")
+    pairs = [('str' + str(i), i) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        def puts(_):
+            hash_map = module.HashMap(11, hash_function_2)
+            for key, value in pairs:
+                hash_map.put(key, value)
+
+        put_time = _best_of(lambda: None, puts)
+        bulk_time = _best_of(lambda: None, lambda _: module.HashMap.from_pairs(pairs, hash_function_2))
+        print(f"{module.__name__:12} put loop {put_time * 1000:8.1f} ms   "
+              f"from_pairs {bulk_time * 1000:8.1f} ms   x{put_time / bulk_time:.1f}")
+
+
+def bench_batch_lookup(n: int = 20000, batch: int = 500) -> None:
+    """
+    Compare looking up batches of keys with a loop of get calls against get_many.
+    Most of the gain comes from hashing a batch at once, so it is largest for hash
+    functions bulk_hash vectorizes and costly per key (fnv1a_64, x2.3 to x2.9 for both maps);
+    otherwise get_many saves the per call overhead, x1.0 to x1.7.
+    """
+    print(f"\nbatched lookups: {n} keys, batches of {batch}")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    batches = [keys[start:start + batch] for start in range(0, n, batch)]
+    for module in (hash_map_oa, hash_map_sc):
+        for function in (hash_function_1, hash_function_2, SeededHash(0), fnv1a_64):
+            def gets(subject):
+                get = subject.get
+                for keys_batch in batches:
+                    [get(key) for key in keys_batch]
+
+            def get_many(subject):
+                for keys_batch in batches:
+                    subject.get_many(keys_batch)
+
+            def setup():
+                return module.HashMap.from_pairs([(key, 1) for key in keys], function)
+
+            # best of 7: with the sample hashes the two are within a few percent of each other
+            loop_time = _best_of(setup, gets, 7)
+            batch_time = _best_of(setup, get_many, 7)
+            name = getattr(function, '__name__', type(function).__name__)
+            print(f"{module.__name__:12} {name:16} get loop {n / loop_time / 1000:8.1f} k ops/s   "
+                  f"get_many {n / batch_time / 1000:8.1f} k ops/s   x{loop_time / batch_time:.1f}")
+
+
+def bench_dynamic_array(n: int = 100000) -> None:
+    """
+    Measure checked DynamicArray indexing against the raw list view,
+    and the resulting cost of a single get in each map
+    """
+    print(f"\nDynamicArray indexing: {n} elements")
+    print("--------------------------------------")
+    array = DynamicArray.filled(n, 0)
+    raw = array.raw()
+    indices = range(n)
+
+    def checked(_):
+        for index in indices:
+            array[index]
+
+    def unchecked(_):
+        for index in indices:
+            raw[index]
+
+    checked_time = _best_of(lambda: None, checked)
+    unchecked_time = _best_of(lambda: None, unchecked)
+    print(f"array[i] {checked_time / n * 1e9:6.0f} ns   raw()[i] {unchecked_time / n * 1e9:6.0f} ns")
+
+    keys = ['str' + str(i) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        def gets(subject):
+            get = subject.get
+            for key in keys:
+                get(key)
+
+        elapsed = _best_of(lambda: module.HashMap.from_pairs([(key, 1) for key in keys], SeededHash(0)), gets)
+        print(f"{module.__name__:12} {elapsed / n * 1e9:6.0f} ns per get")
+
+
+def bench_memory(n: int = 50000) -> None:
+    """
+    Report bytes per empty bucket and bytes per stored entry (excluding the keys
+    and values themselves) for each bucket layout
+    """
+    print(f"\nmemory: {n} keys, presized so no resize happens")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    layouts = (
+        ('hash_map_sc', lambda: hash_map_sc.HashMap(n, SeededHash(0))),
+        ('hash_map_sc lazy', lambda: hash_map_sc.HashMap(n, SeededHash(0), lazy_buckets=True)),
+        ('hash_map_oa entry', lambda: hash_map_oa.HashMap(2 * n + 1, SeededHash(0), storage='entry')),
+        ('hash_map_oa array', lambda: hash_map_oa.HashMap(2 * n + 1, SeededHash(0), storage='array')),
+    )
+    for name, factory in layouts:
+        tracemalloc.start()
+        hash_map = factory()
+        empty = tracemalloc.get_traced_memory()[0]
+        capacity = hash_map.get_capacity()
+        for key in keys:
+            hash_map.put(key, None)
+        full = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:18} {empty / capacity:6.1f} bytes/empty bucket   "
+              f"{(full - empty) / n:6.1f} bytes/entry")
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    """
+    Return the value at the given fraction of an already sorted list
+    """
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_put_latency(n: int = 200000, resize_batch: int = 8) -> None:
+    """
+    Time every single put while filling a map from a small capacity, with stop-the-world
+    and incremental resizing, and print the latency percentiles and a histogram
+    of the latencies in power of two microsecond bins.
+    The garbage collector is paused while timing so its pauses are not counted as resizes.
+    """
+    print(f"\nput latency: {n} keys from capacity 11, resize_batch {resize_batch}")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        for incremental in (False, True):
+            hash_map = module.HashMap(11, SeededHash(0), incremental_resize=incremental,
+                                      resize_batch=resize_batch)
+            put, clock = hash_map.put, time.perf_counter_ns
+            latencies = []
+            gc.disable()
+            try:
+                for i, key in enumerate(keys):
+                    start = clock()
+                    put(key, i)
+                    latencies.append(clock() - start)
+            finally:
+                gc.enable()
+
+            latencies.sort()
+            mode = 'incremental' if incremental else 'stop-the-world'
+            print(f"{module.__name__:12} {mode:14} "
+                  f"p50 {_percentile(latencies, 0.5) / 1000:7.1f} us   "
+                  f"p99 {_percentile(latencies, 0.99) / 1000:7.1f} us   "
+                  f"p99.9 {_percentile(latencies, 0.999) / 1000:7.1f} us   "
+                  f"max {latencies[-1] / 1000:9.1f} us")
+
+            histogram = {}
+            for latency in latencies:
+                bin = max(latency // 1000, 1).bit_length() - 1
+                histogram[bin] = histogram.get(bin, 0) + 1
+            print(' ' * 13 + '   '.join(f"<{2 ** (bin + 1)}us: {count}" for bin, count in sorted(histogram.items())))
+
+
+def bench_concurrent(threads: int = 4, n: int = 20000) -> None:
+    """
+    Compare threads sharing one SC map behind a single global lock
+    against sharing a lock striped ConcurrentHashMap, on a mix of gets and increments
+    """
+    print(f"\nshared map: {threads} threads x {n} ops, 80% get / 20% increment")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(1000)]
+
+    def run(worker) -> float:
+        workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - start
+
+    hash_map, lock = hash_map_sc.HashMap(11, SeededHash(0)), threading.Lock()
+
+    def global_lock(offset):
+        for i in range(n):
+            key = keys[(i + offset) % len(keys)]
+            with lock:
+                if i % 5:
+                    hash_map.get(key)
+                else:
+                    hash_map.put(key, (hash_map.get(key) or 0) + 1)
+
+    striped = ConcurrentHashMap(11, SeededHash(0))
+
+    def striped_locks(offset):
+        for i in range(n):
+            key = keys[(i + offset) % len(keys)]
+            if i % 5:
+                striped.get(key)
+            else:
+                striped.increment(key)
+
+    total = threads * n
+    print(f"global lock {total / run(global_lock) / 1000:8.1f} k ops/s   "
+          f"lock striping {total / run(striped_locks) / 1000:8.1f} k ops/s")
+
+
+def bench_iteration(n: int = 200000) -> None:
+    """
+    Compare a full scan through get_keys_and_values against the lazy items() view:
+    time and peak memory allocated during the scan
+    """
+    print(f"\nfull scan: {n} keys")
+    print("--------------------------------------")
+    pairs = [('str' + str(i), i) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        hash_map = module.HashMap.from_pairs(pairs, SeededHash(0))
+
+        def materialized(subject):
+            pairs = subject.get_keys_and_values()
+            for index in range(pairs.length()):
+                pairs[index]
+
+        def lazy(subject):
+            for _ in subject.items():
+                pass
+
+        for name, scan in (('get_keys_and_values', materialized), ('items()', lazy)):
+            tracemalloc.start()
+            scan(hash_map)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            elapsed = _best_of(lambda: hash_map, scan)
+            print(f"{module.__name__:12} {name:20} {elapsed * 1000:8.1f} ms   peak {peak / 1024:9.1f} KiB")
+
+
+def bench_counters(n: int = 100000, distinct: int = 5000) -> None:
+    """
+    Compare counting keys with contains_key, get and put against increment
+    """
+    print(f"\ncounters: {n} increments over {distinct} keys")
+    print("--------------------------------------")
+    keys = ['token' + str(i * 7919 % distinct) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        def read_modify_write(subject):
+            for key in keys:
+                if subject.contains_key(key):
+                    subject.put(key, subject.get(key) + 1)
+                else:
+                    subject.put(key, 1)
+
+        def increment(subject):
+            for key in keys:
+                subject.increment(key)
+
+        def setup():
+            return module.HashMap(11, SeededHash(0))
+
+        before = _best_of(setup, read_modify_write)
+        after = _best_of(setup, increment)
+        print(f"{module.__name__:12} contains/get/put {n / before / 1000:8.1f} k ops/s   "
+              f"increment {n / after / 1000:8.1f} k ops/s   x{before / after:.1f}")
+
+
+def bench_find_mode(n: int = 400000, distinct: int = 5000) -> None:
+    """
+    Compare find_mode against parallel_find_mode in-process and sharded
+    across every CPU
+    """
+    workers = os.cpu_count() or 1
+    print(f"\nfind_mode: {n} tokens, {distinct} distinct, {workers} CPUs")
+    print("--------------------------------------")
+    da = DynamicArray(['token' + str(i * 7919 % distinct) for i in range(n)])
+    baseline = _best_of(lambda: da, hash_map_sc.find_mode, repeat=1)
+    single = _best_of(lambda: da, lambda subject: parallel_find_mode(subject, workers=1), repeat=1)
+    sharded = _best_of(lambda: da, lambda subject: parallel_find_mode(subject, workers=workers), repeat=1)
+    print(f"find_mode {baseline * 1000:8.1f} ms   parallel_find_mode 1 worker {single * 1000:8.1f} ms   "
+          f"{workers} workers {sharded * 1000:8.1f} ms")
+
+
+def bench_snapshot(n: int = 100000, lookups: int = 1000) -> None:
+    """
+    Compare cold start times of an OA map: replaying put for every pair,
+    loading a snapshot into memory, and memory mapping it, each followed by a few lookups
+    """
+    print(f"\nOA snapshot cold start: {n} keys, then {lookups} gets")
+    print("--------------------------------------")
+    pairs = [('str' + str(i), i) for i in range(n)]
+    probe = [key for key, _ in pairs[::n // lookups]]
+    path = os.path.join(tempfile.mkdtemp(), 'map.snapshot')
+    hash_map_oa.HashMap.from_pairs(pairs, fnv1a_64).save(path)
+
+    def replay(_):
+        hash_map = hash_map_oa.HashMap.from_pairs(pairs, fnv1a_64)
+        for key in probe:
+            hash_map.get(key)
+
+    def load(_):
+        hash_map = hash_map_oa.HashMap.load(path, fnv1a_64, storage='array')
+        for key in probe:
+            hash_map.get(key)
+
+    def mapped(_):
+        with hash_map_oa.HashMap.load(path, fnv1a_64, mapped=True) as hash_map:
+            for key in probe:
+                hash_map.get(key)
+
+    print(f"snapshot {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+    for name, start in (('replay puts', replay), ('load', load), ('mapped', mapped)):
+        print(f"{name:12} {_best_of(lambda: None, start) * 1000:9.1f} ms")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+def bench_instrumentation(n: int = 50000) -> None:
+    """
+    Compare put and get throughput with instrumentation off and on
+    """
+    print(f"\ninstrumentation overhead: {n} puts then {n} gets")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    for module in (hash_map_oa, hash_map_sc):
+        times = []
+        for instrument in (False, True):
+            def workload(_):
+                hash_map = module.HashMap(11, SeededHash(0), instrument=instrument)
+                for key in keys:
+                    hash_map.put(key, 1)
+                for key in keys:
+                    hash_map.get(key)
+
+            times.append(_best_of(lambda: None, workload))
+        print(f"{module.__name__:12} off {2 * n / times[0] / 1000:8.1f} k ops/s   "
+              f"on {2 * n / times[1] / 1000:8.1f} k ops/s   +{(times[1] / times[0] - 1) * 100:.0f}%")
+
+
+def bench_empty_buckets(n: int = 200000, polls: int = 100) -> None:
+    """
+    Compare empty_buckets, read from the occupancy counters, against the full
+    table scan it used to do (which check_counters still does)
+    """
+    print(f"\nempty_buckets: {n} keys, {polls} polls")
+    print("--------------------------------------")
+    for module in (hash_map_oa, hash_map_sc):
+        hash_map = module.HashMap(11, SeededHash(0))
+        for i in range(n):
+            hash_map.put('str' + str(i), i)
+
+        def counters(subject):
+            for _ in range(polls):
+                subject.empty_buckets()
+
+        def scan(subject):
+            for _ in range(polls):
+                subject.check_counters()
+
+        after = _best_of(lambda: hash_map, counters)
+        before = _best_of(lambda: hash_map, scan)
+        print(f"{module.__name__:12} scan {before / polls * 1e6:10.1f} us/poll   "
+              f"counters {after / polls * 1e6:6.2f} us/poll")
+
+
+def bench_load_policy(n: int = 100000) -> None:
+    """
+    Show the throughput / memory frontier of several load policies: time to put
+    n keys and get each once, against the traced memory of the finished map
+    """
+    print(f"\nload policies: {n} puts then {n} gets")
+    print("--------------------------------------")
+    keys = ['str' + str(i) for i in range(n)]
+    policies = (
+        (hash_map_oa, 0.75, LoadPolicy(0.25)),
+        (hash_map_oa, 0.75, LoadPolicy(0.5)),
+        (hash_map_oa, 0.75, LoadPolicy(0.5, growth_factor=4)),
+        (hash_map_oa, 0.9, LoadPolicy(0.7, growth_factor=1.5)),
+        (hash_map_oa, 0.9, LoadPolicy(0.85)),
+        (hash_map_sc, None, LoadPolicy(0.5)),
+        (hash_map_sc, None, LoadPolicy(1.0)),
+        (hash_map_sc, None, LoadPolicy(2.0, growth_factor=1.5)),
+        (hash_map_sc, None, LoadPolicy(4.0)),
+    )
+    for module, compact_threshold, policy in policies:
+        extra = {} if compact_threshold is None else {'compact_threshold': compact_threshold}
+
+        def workload(_):
+            hash_map = module.HashMap(11, SeededHash(0), load_policy=policy, **extra)
+            for key in keys:
+                hash_map.put(key, 1)
+            for key in keys:
+                hash_map.get(key)
+
+        elapsed = _best_of(lambda: None, workload)
+
+        tracemalloc.start()
+        hash_map = module.HashMap(11, SeededHash(0), load_policy=policy, **extra)
+        for key in keys:
+            hash_map.put(key, 1)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        print(f"{module.__name__:12} max_load {policy.max_load:4} growth {policy.growth_factor:3}   "
+              f"{2 * n / elapsed / 1000:8.1f} k ops/s   {memory / 2 ** 20:7.2f} MiB   "
+              f"load {hash_map.table_load():.2f}")
+
+
+def bench_bulk_hash(n: int = 20000, batch: int = 500) -> None:
+    """
+    Compare hashing n keys one at a time against hash_many, and put_many / get_many
+    with the vectorized hashes against the same calls hashing key by key
+    """
+    print(f"\nvectorized hashing: {n} keys, get_many batches of {batch}")
+    print("--------------------------------------")
+    if not bulk_hash.HAVE_NUMPY:
+        print("NumPy is not installed, skipped")
+        return
+    pairs = [('str' + str(i), i) for i in range(n)]
+    keys = [key for key, _ in pairs]
+    batches = [keys[start:start + batch] for start in range(0, n, batch)]
+    for function in (hash_function_2, fnv1a_64):
+        scalar_time = _best_of(lambda: None, lambda _: [function(key) for key in keys])
+        vector_time = _best_of(lambda: None, lambda _: bulk_hash.hash_many(function, keys))
+        print(f"{function.__name__:16} hashing      scalar {scalar_time * 1000:8.1f} ms   "
+              f"hash_many {vector_time * 1000:8.1f} ms   x{scalar_time / vector_time:.1f}")
+
+        for module in (hash_map_oa, hash_map_sc):
+            def load(_):
+                module.HashMap(11, function).put_many(pairs)
+
+            def lookups(subject):
+                for keys_batch in batches:
+                    subject.get_many(keys_batch)
+
+            def setup():
+                return module.HashMap.from_pairs(pairs, function)
+
+            times = {}
+            for have_numpy in (False, True):
+                bulk_hash.HAVE_NUMPY = have_numpy
+                try:
+                    times[have_numpy] = _best_of(lambda: None, load), _best_of(setup, lookups)
+                finally:
+                    bulk_hash.HAVE_NUMPY = True
+            (scalar_load, scalar_get), (vector_load, vector_get) = times[False], times[True]
+            print(f"{function.__name__:16} {module.__name__:12} put_many x{scalar_load / vector_load:.2f}   "
+                  f"get_many x{scalar_get / vector_get:.2f}")
+
+
+def bench_int_keys(n: int = 100000) -> None:
+    """
+    Compare an IntHashMap of n int IDs against HashMaps holding the same IDs
+    converted with str: time to put every ID and get each once, and the
+    traced memory of the loaded map
+    """
+    print(f"\nint keys: {n} puts then {n} gets")
+    print("--------------------------------------")
+    ids = random.Random(0).sample(range(10 ** 12), n)
+    engines = (
+        ('str, fnv1a_64', lambda: hash_map_oa.HashMap(11, fnv1a_64), str),
+        ('str, seeded', lambda: hash_map_oa.HashMap(11, SeededHash(0)), str),
+        ('str, seeded, array', lambda: hash_map_oa.HashMap(11, SeededHash(0), storage='array'), str),
+        ('IntHashMap', hash_map_oa.IntHashMap, int),
+    )
+    for name, make, convert in engines:
+        def load(_):
+            hash_map = make()
+            for key in ids:
+                hash_map.put(convert(key), key)
+
+        def lookups(hash_map):
+            for key in ids:
+                hash_map.get(convert(key))
+
+        def setup():
+            hash_map = make()
+            for key in ids:
+                hash_map.put(convert(key), key)
+            return hash_map
+
+        put_time = _best_of(lambda: None, load)
+        get_time = _best_of(setup, lookups)
+
+        tracemalloc.start()
+        # held until the traced memory is read, which only counts live allocations
+        hash_map = setup()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del hash_map
+
+        print(f"{name:20} put {n / put_time / 1000:8.1f} k ops/s   get {n / get_time / 1000:8.1f} k ops/s   "
+              f"{memory / 2 ** 20:7.2f} MiB")
+
+
+def bench_bounded_cache(n: int = 200000, distinct: int = 20000, max_entries: int = 2000) -> None:
+    """
+    Run n skewed get-or-put accesses over distinct keys through a cache of max_entries:
+    BoundedCache with LRU and LFU eviction, against a HashMap with the LRU bookkeeping
+    kept in an OrderedDict next to it
+    """
+    print(f"\nbounded cache: {n} accesses over {distinct} keys, {max_entries} entries")
+    print("--------------------------------------")
+    rng = random.Random(0)
+    # a few keys are hot, most are cold
+    keys = ['str' + str(int(distinct * rng.random() ** 3)) for _ in range(n)]
+
+    def external(_):
+        hash_map, order = hash_map_sc.HashMap(max_entries + 1, SeededHash(0)), OrderedDict()
+        hits = 0
+        for key in keys:
+            if hash_map.get(key) is not None:
+                order.move_to_end(key)
+                hits += 1
+                continue
+            if len(order) >= max_entries:
+                hash_map.remove(order.popitem(last=False)[0])
+            hash_map.put(key, key)
+            order[key] = None
+        return hits
+
+    def cached(eviction):
+        def run(_):
+            cache = BoundedCache(11, SeededHash(0), eviction, max_entries=max_entries)
+            for key in keys:
+                if cache.get(key) is None:
+                    cache.put(key, key)
+            return cache.stats()['hit_rate']
+        return run
+
+    elapsed = _best_of(lambda: None, external)
+    print(f"{'HashMap + OrderedDict':22} {n / elapsed / 1000:8.1f} k ops/s   hit rate {external(None) / n:.3f}")
+    for eviction in ('lru', 'lfu'):
+        run = cached(eviction)
+        elapsed = _best_of(lambda: None, run)
+        print(f"{'BoundedCache ' + eviction:22} {n / elapsed / 1000:8.1f} k ops/s   hit rate {run(None):.3f}")
+
+
+def bench_ttl(n: int = 50000, steps: int = 200) -> None:
+    """
+    Give n keys ttls spread over steps seconds and expire them one second at a time:
+    expire_due of the expiring maps against scanning a HashMap of deadlines every second
+    """
+    print(f"\nttl expiry: {n} keys expiring over {steps} steps")
+    print("--------------------------------------")
+    rng = random.Random(0)
+    items = [('str' + str(i), rng.uniform(0.5, steps)) for i in range(n)]
+
+    def scanned(_):
+        hash_map = hash_map_sc.HashMap(11, SeededHash(0))
+        for key, ttl in items:
+            hash_map.put(key, ttl)
+        for now in range(1, steps + 1):
+            pairs = hash_map.get_keys_and_values()
+            for index in range(pairs.length()):
+                key, deadline = pairs[index]
+                if deadline <= now:
+                    hash_map.remove(key)
+        return hash_map.get_size()
+
+    def wheel(cls):
+        def run(_):
+            clock = [0.0]
+            hash_map = cls(11, SeededHash(0), clock=lambda: clock[0])
+            for key, ttl in items:
+                hash_map.put(key, key, ttl=ttl)
+            for now in range(1, steps + 1):
+                clock[0] = now
+                hash_map.expire_due()
+            return hash_map.get_size()
+        return run
+
+    elapsed = _best_of(lambda: None, scanned)
+    print(f"{'scan deadlines':22} {elapsed * 1000:8.1f} ms")
+    for cls in (ExpiringHashMapOA, ExpiringHashMapSC):
+        elapsed = _best_of(lambda: None, wheel(cls))
+        print(f"{cls.__name__:22} {elapsed * 1000:8.1f} ms")
+
+
+def bench_loop_lag(n: int = 100000, batch: int = 1024) -> None:
+    """
+    Resize, list and clear a map of n keys inside an event loop and report the longest
+    stall of a task that yields as often as it can: the blocking calls of the map
+    against the AsyncHashMap coroutines, batch buckets at a time or with the resize
+    offloaded to a worker thread. The garbage collector is off while measuring,
+    so its pauses are not counted.
+    """
+    print(f"\nevent loop lag: {n} keys, batches of {batch} buckets")
+    print("--------------------------------------")
+    pairs = [('str' + str(i), i) for i in range(n)]
+
+    async def measure(work) -> tuple:
+        done, longest = False, 0.0
+
+        async def ticker():
+            nonlocal longest
+            last = time.perf_counter()
+            while not done:
+                await asyncio.sleep(0)
+                now = time.perf_counter()
+                longest, last = max(longest, now - last), now
+
+        gc.collect()
+        gc.disable()
+        try:
+            task = asyncio.create_task(ticker())
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            await work()
+            elapsed = time.perf_counter() - start
+            done = True
+            await task
+        finally:
+            gc.enable()
+        return longest, elapsed
+
+    async def run(make, name):
+        print(name)
+        for operation in ('resize', 'get_keys_and_values', 'clear'):
+            modes = ('blocking', 'AsyncHashMap', 'offload') if operation == 'resize' else \
+                ('blocking', 'AsyncHashMap')
+            for mode in modes:
+                hash_map = make()
+                async_map = AsyncHashMap(hash_map, batch)
+                capacity = hash_map.get_capacity() * 2
+
+                async def work():
+                    if mode == 'blocking' and operation == 'resize':
+                        hash_map.resize_table(capacity)
+                    elif mode == 'blocking':
+                        getattr(hash_map, operation)()
+                    elif operation == 'resize':
+                        await async_map.resize(capacity, offload=mode == 'offload')
+                    else:
+                        await getattr(async_map, operation)()
+
+                longest, elapsed = await measure(work)
+                print(f"  {operation:20} {mode:13} longest stall {longest * 1000:8.2f} ms   "
+                      f"total {elapsed * 1000:8.1f} ms")
+
+    async def main():
+        await run(lambda: hash_map_oa.HashMap.from_pairs(pairs, SeededHash(0)), 'open addressing')
+        await run(lambda: hash_map_sc.HashMap.from_pairs(pairs, SeededHash(0)), 'separate chaining')
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    bench_resize()
+    bench_storage()
+    bench_probing()
+    bench_capacity_policy()
+    bench_bulk_load()
+    bench_batch_lookup()
+    bench_dynamic_array()
+    bench_memory()
+    bench_put_latency()
+    bench_concurrent()
+    bench_iteration()
+    bench_counters()
+    bench_find_mode()
+    bench_snapshot()
+    bench_instrumentation()
+    bench_empty_buckets()
+    bench_load_policy()
+    bench_bulk_hash()
+    bench_int_keys()
+    bench_bounded_cache()
+    bench_ttl()
+    bench_loop_lag()
@@ -0,0 +1,314 @@
+# Description: Workload benchmark suite comparing the OA and SC hash maps with a dict baseline.
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from timeit import default_timer
+
+import hash_map_oa
+import hash_map_sc
+from DS_include import EMPTY, hash_function_1, hash_function_2
+from hash_functions import SeededHash, fnv1a_64
+
+# operation codes of a workload's operation stream
+GET, PUT, REMOVE, INCREMENT, SCAN = range(5)
+
+WORKLOADS = ('insert', 'read', 'churn', 'mixed', 'find_mode')
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'seeded_builtin': SeededHash(0),
+    'fnv1a_64': fnv1a_64,
+}
+
+
+class DictMap(dict):
+    """
+    dict with the method names of the hash maps, used as the baseline engine
+    """
+
+    put = dict.__setitem__
+
+    def remove(self, key: object) -> None:
+        """Remove key if it is present."""
+        self.pop(key, None)
+
+    def increment(self, key: object, delta: int = 1) -> int:
+        """Add delta to the value of key, starting from 0, and return the new value."""
+        value = self[key] = self.get(key, 0) + delta
+        return value
+
+
+ENGINES = {
+    'oa': lambda function: hash_map_oa.HashMap(11, function),
+    'sc': lambda function: hash_map_sc.HashMap(11, function),
+    'dict': lambda function: DictMap(),
+}
+
+
+def make_workload(name: str, size: int, seed: int = 0) -> tuple:
+    """
+    Return (keys to load before timing, operation stream) for a workload over size keys.
+    insert      size puts of new keys into an empty map
+    read        size gets on a loaded map, 90% hits
+    churn       size operations on a loaded map alternating removing a present key
+                and putting a new one, so the size stays constant
+    mixed       size operations on a loaded map: 70% get, 20% put, 10% remove
+    find_mode   size increments over size / 10 distinct tokens, then a scan for the highest count
+    """
+    rng = random.Random(seed)
+    keys = ['str' + str(i) for i in range(size)]
+
+    if name == 'insert':
+        return [], [(PUT, key) for key in keys]
+
+    if name == 'read':
+        ops = [(GET, keys[rng.randrange(size)] if rng.random() < 0.9 else 'miss' + str(i))
+               for i in range(size)]
+        return keys, ops
+
+    if name == 'churn':
+        ops, present = [], list(keys)
+        for i in range(size):
+            if i % 2:
+                ops.append((PUT, 'new' + str(i)))
+                present.append('new' + str(i))
+            else:
+                # swap a random present key to the end so it can be popped in O(1)
+                index = rng.randrange(len(present))
+                present[index], present[-1] = present[-1], present[index]
+                ops.append((REMOVE, present.pop()))
+        return keys, ops
+
+    if name == 'mixed':
+        ops = []
+        for i in range(size):
+            roll = rng.random()
+            if roll < 0.7:
+                ops.append((GET, keys[rng.randrange(size)]))
+            elif roll < 0.9:
+                ops.append((PUT, keys[rng.randrange(size)] if rng.random() < 0.5 else 'new' + str(i)))
+            else:
+                ops.append((REMOVE, keys[rng.randrange(size)]))
+        return keys, ops
+
+    if name == 'find_mode':
+        distinct = max(1, size // 10)
+        return [], [(INCREMENT, 'token' + str(i * 7919 % distinct)) for i in range(size)] + [(SCAN, None)]
+
+    raise ValueError(f"unknown workload {name!r}")
+
+
+def _runner(hash_map, timed: bool):
+    """
+    Return a function that applies an operation stream to hash_map, recording
+    the latency of every operation in nanoseconds into a list when timed
+    """
+    get, put, remove, increment = hash_map.get, hash_map.put, hash_map.remove, hash_map.increment
+    clock = time.perf_counter_ns
+
+    def run(ops: list, latencies: list = None) -> None:
+        for op, key in ops:
+            if timed:
+                start = clock()
+            if op == GET:
+                get(key)
+            elif op == PUT:
+                put(key, 1)
+            elif op == REMOVE:
+                remove(key)
+            elif op == INCREMENT:
+                increment(key)
+            else:
+                max(hash_map.values(), default=0)
+            if timed:
+                latencies.append(clock() - start)
+
+    return run
+
+
+def _loaded(engine: str, function, keys: list):
+    """Return a new map of the engine holding every key."""
+    hash_map = ENGINES[engine](function)
+    for key in keys:
+        hash_map.put(key, 1)
+    return hash_map
+
+
+def probe_length(hash_map, key: object) -> int:
+    """
+    Return the number of buckets (OA) or chain nodes (SC) examined to find key,
+    or None for engines without a visible layout
+    """
+    if isinstance(hash_map, hash_map_oa.HashMap):
+        hash = hash_map._hash(key)
+        storage, capacity = hash_map._storage, hash_map._capacity
+        count = 0
+        for index in hash_map._probing.probe(hash_map._home(hash, capacity), hash, capacity, key):
+            count += 1
+            slot_hash = storage.hash_at(index)
+            if slot_hash == EMPTY or (slot_hash == hash and storage.key_at(index) == key):
+                break
+        return count
+
+    if isinstance(hash_map, hash_map_sc.HashMap):
+        hash = hash_map._hash_function(key)
+        bucket = hash_map._bucket_list[hash_map._home(hash, hash_map._capacity)]
+        count = 0
+        node = bucket.head() if bucket is not None else None
+        while node is not None:
+            count += 1
+            if node.key == key:
+                break
+            node = node.next
+        return count
+
+    return None
+
+
+def run_case(engine: str, function_name: str, workload: str, size: int,
+             repeat: int = 3, probe_sample: int = 1000) -> dict:
+    """
+    Benchmark one engine / hash function / workload / size combination and return its results:
+    throughput from the best of repeat untimed runs, p50 / p99 / max latency from a run
+    timing every operation, peak traced memory of loading the map and running the workload,
+    and the mean and longest probe length over a sample of the keys left in the map
+    """
+    function = HASH_FUNCTIONS[function_name]
+    keys, ops = make_workload(workload, size)
+
+    best = float('inf')
+    for _ in range(repeat):
+        hash_map = _loaded(engine, function, keys)
+        run = _runner(hash_map, timed=False)
+        start = default_timer()
+        run(ops)
+        best = min(best, default_timer() - start)
+
+    latencies = []
+    hash_map = _loaded(engine, function, keys)
+    _runner(hash_map, timed=True)(ops, latencies)
+    latencies.sort()
+
+    tracemalloc.start()
+    _runner(_loaded(engine, function, keys), timed=False)(ops)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    lengths = []
+    for key in list(hash_map.keys())[:probe_sample]:
+        length = probe_length(hash_map, key)
+        if length is not None:
+            lengths.append(length)
+
+    return {
+        'engine': engine,
+        'function': function_name,
+        'workload': workload,
+        'size': size,
+        'ops': len(ops),
+        'seconds': best,
+        'ops_per_sec': len(ops) / best if best else None,
+        'p50_ns': latencies[len(latencies) // 2],
+        'p99_ns': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'max_ns': latencies[-1],
+        'peak_bytes': peak,
+        'probe_mean': sum(lengths) / len(lengths) if lengths else None,
+        'probe_max': max(lengths) if lengths else None,
+    }
+
+
+def run_suite(engines, functions, workloads, sizes, repeat: int = 3, report=print) -> dict:
+    """
+    Run every combination and return the results with a description of the machine,
+    in the shape saved as JSON. report is called with a line per finished case.
+    """
+    results = []
+    for size in sizes:
+        for workload in workloads:
+            for function_name in functions:
+                for engine in engines:
+                    # the dict baseline ignores the hash function, so it only runs once
+                    if engine == 'dict' and function_name != functions[0]:
+                        continue
+                    result = run_case(engine, function_name, workload, size, repeat)
+                    results.append(result)
+                    report(format_result(result))
+    return {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def format_result(result: dict) -> str:
+    """Return a one line summary of a case's results."""
+    probes = '' if result['probe_mean'] is None else \
+        f"   probes {result['probe_mean']:6.2f} avg {result['probe_max']:5} max"
+    function = '-' if result['engine'] == 'dict' else result['function']
+    return (f"{result['workload']:9} {result['size']:>9} {result['engine']:4} {function:16} "
+            f"{result['ops_per_sec'] / 1000:9.1f} k ops/s   p50 {result['p50_ns'] / 1000:7.2f} us   "
+            f"p99 {result['p99_ns'] / 1000:8.2f} us   peak {result['peak_bytes'] / 2 ** 20:8.2f} MiB{probes}")
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1, report=print) -> int:
+    """
+    Report the throughput change of every case present in both result sets and
+    return how many got slower by more than threshold
+    """
+    def key(result):
+        return result['engine'], result['function'], result['workload'], result['size']
+
+    previous = {key(result): result for result in baseline['results']}
+    regressions = 0
+    for result in current['results']:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        change = result['ops_per_sec'] / old['ops_per_sec'] - 1
+        flag = ''
+        if change < -threshold:
+            regressions += 1
+            flag = '   REGRESSION'
+        report(f"{' '.join(map(str, key(result))):60} {change * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    """Command line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Benchmark the OA and SC hash maps against dict.")
+    parser.add_argument('--engines', nargs='+', choices=tuple(ENGINES), default=list(ENGINES))
+    parser.add_argument('--functions', nargs='+', choices=tuple(HASH_FUNCTIONS),
+                        default=['hash_function_1', 'hash_function_2'])
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--sizes', nargs='+', type=lambda size: int(float(size)), default=[1000, 10000],
+                        help="key counts, e.g. 1e3 1e4 1e5; hash_function_1 clusters so badly that "
+                             "sizes past 1e5 take very long with it")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="save the results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare throughput against")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="throughput drop counted as a regression by --compare")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.engines, args.functions, args.workloads, args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print(f"\nthroughput against {args.compare}")
+        if compare(baseline, results, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+# Description: A size bounded LRU / LFU cache built on the separate chaining hash map.
+
+import sys
+
+import hash_map_sc
+from DS_include import DynamicArray, LinkedList, SLNode, as_list, hash_function_1
+
+EVICTION_POLICIES = ('lru', 'lfu')
+
+
+class CacheNode(SLNode):
+    """
+    Chain node of a BoundedCache. Besides the bucket chain link, every node is on the
+    recency list of its frequency group: newer and older are its neighbours there.
+    """
+
+    __slots__ = ('newer', 'older', 'group', 'size')
+
+    def __init__(self, key: object, value: object, next: SLNode = None, hash: int = None,
+                 size: int = 0) -> None:
+        """Initialize a node that is not on any recency list yet."""
+        # the SLNode fields are set here directly, this runs on every insert
+        self.key = key
+        self.value = value
+        self.next = next
+        self.hash = hash
+        self.newer = self.older = self
+        self.group = None
+        # bytes charged to the entry against max_bytes
+        self.size = size
+
+
+class FrequencyGroup:
+    """
+    Entries of a BoundedCache accessed the same number of times, as a circular recency
+    list through a sentinel node: entries.newer is the oldest entry, entries.older the
+    newest. Groups are kept on their own circular list in increasing frequency order.
+    """
+
+    __slots__ = ('frequency', 'entries', 'lower', 'higher')
+
+    def __init__(self, frequency: int) -> None:
+        """Initialize an empty group that is not on the group list yet."""
+        self.frequency = frequency
+        self.entries = CacheNode(None, None)
+        self.lower = self.higher = self
+
+    def is_empty(self) -> bool:
+        """Return True if the group holds no entries."""
+        return self.entries.newer is self.entries
+
+    def append(self, node: CacheNode) -> None:
+        """Link node into the group as its newest entry."""
+        sentinel = self.entries
+        node.older, node.newer = sentinel.older, sentinel
+        sentinel.older.newer = node
+        sentinel.older = node
+        node.group = self
+
+    def insert_after(self, group: "FrequencyGroup") -> None:
+        """Link this group into the group list right after group."""
+        self.lower, self.higher = group, group.higher
+        group.higher.lower = self
+        group.higher = self
+
+    def unlink(self) -> None:
+        """Take this group off the group list."""
+        self.lower.higher = self.higher
+        self.higher.lower = self.lower
+
+
+def _unlink_node(node: CacheNode) -> None:
+    """Take node off the recency list of its group."""
+    node.older.newer = node.newer
+    node.newer.older = node.older
+    node.newer = node.older = node
+
+
+def default_size_of(key: object, value: object) -> int:
+    """Bytes charged to an entry when the cache has a max_bytes limit: the shallow sizes of key and value."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class BoundedCache(hash_map_sc.HashMap):
+    """
+    Separate chaining hash map that holds at most max_entries entries and / or
+    max_bytes bytes, evicting entries to stay within the limits.
+    With 'lru' eviction the least recently used entry goes first. With 'lfu' the
+    least frequently used one does, the least recently used among equals.
+    Recency and frequency are kept on lists threaded through the chain nodes
+    themselves, so a hit costs the same single bucket lookup as a plain get,
+    and an eviction unlinks the victim from its own chain without any scan.
+    get, get_many and every update count as uses; contains_key, contains_many and
+    iteration do not. stats() adds hit, miss and eviction counts to those of the map.
+    Supported methods are those of hash_map_sc.HashMap.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 eviction: str = 'lru',
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 size_of: callable = default_size_of,
+                 capacity_policy: str = 'prime') -> None:
+        """
+        Initialize new BoundedCache. At least one of max_entries and max_bytes must be given.
+        size_of(key, value) is the number of bytes an entry is charged against max_bytes.
+        With max_entries the table is sized for the limit up front, so it never resizes.
+        """
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"unknown eviction policy {eviction!r}")
+        if max_entries is None and max_bytes is None:
+            raise ValueError("a BoundedCache needs max_entries or max_bytes")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        if max_entries is not None:
+            # one spare slot, since a put checks the load before it evicts
+            capacity = max(capacity, max_entries + 1)
+        super().__init__(capacity, function, capacity_policy)
+
+        self._lfu = eviction == 'lfu'
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size_of = size_of if max_bytes is not None else None
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        # sentinel of the circular list of frequency groups; LRU uses a single group
+        self._groups = FrequencyGroup(0)
+
+    def get_eviction(self) -> str:
+        """
+        Return name of the eviction policy
+        """
+        return 'lfu' if self._lfu else 'lru'
+
+    def get_bytes(self) -> int:
+        """
+        Return the bytes charged to the entries, 0 without a max_bytes limit
+        """
+        return self._bytes
+
+    def stats(self) -> dict:
+        """
+        Return the statistics of the map plus the hits and misses of get and get_many,
+        the hit rate, the number of evictions and the bytes charged to the entries
+        """
+        result = super().stats()
+        lookups = self._hits + self._misses
+        result.update({
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+            'evictions': self._evictions,
+            'bytes': self._bytes,
+        })
+        return result
+
+    # ------------------------------------------------------------------ #
+
+    def _touch(self, node: CacheNode) -> None:
+        """
+        Helper function recording a use of node: it becomes the newest entry of its
+        group, moving up to the group of the next frequency under LFU
+        """
+        group = node.group
+        if not self._lfu:
+            # move node to the newest end of its group, spelled out since every hit does it
+            sentinel = group.entries
+            if sentinel.older is not node:
+                node.older.newer = node.newer
+                node.newer.older = node.older
+                node.older, node.newer = sentinel.older, sentinel
+                sentinel.older.newer = node
+                sentinel.older = node
+            return
+
+        _unlink_node(node)
+        target = group.higher
+        if target.frequency != group.frequency + 1:
+            target = FrequencyGroup(group.frequency + 1)
+            target.insert_after(group)
+        target.append(node)
+        if group.is_empty():
+            group.unlink()
+
+    def _forget(self, node: CacheNode) -> None:
+        """Helper function to drop a node that left the table from the recency lists."""
+        group = node.group
+        _unlink_node(node)
+        if group.is_empty():
+            group.unlink()
+        self._bytes -= node.size
+
+    def _evict_until(self, entries: int, size: int) -> None:
+        """
+        Helper function evicting entries, oldest of the lowest frequency first, until
+        entries more entries holding size more bytes fit within the limits
+        """
+        max_entries, max_bytes = self._max_entries, self._max_bytes
+        while self._size > 0 and (
+                (max_entries is not None and self._size + entries > max_entries) or
+                (max_bytes is not None and self._bytes + size > max_bytes)):
+            victim = self._groups.higher.entries.newer
+            self._remove(victim.key, victim.hash)
+            self._forget(victim)
+            self._evictions += 1
+
+    def _recharge(self, node: CacheNode) -> None:
+        """
+        Helper function charging node again after its value was replaced, evicting
+        entries if the new value does not fit; node itself is evicted if it comes up
+        """
+        if self._size_of is not None:
+            size = self._size_of(node.key, node.value)
+            self._bytes += size - node.size
+            node.size = size
+            self._evict_until(0, 0)
+
+    def _bucket_of(self, hash: int) -> LinkedList:
+        """
+        Helper function returning the bucket whose chain holds hash, in the old table
+        while an incremental resize (driven by an AsyncHashMap) has not moved it yet
+        """
+        if self._old_buckets is None:
+            return self._bucket_list[self._home(hash, self._capacity)]
+        buckets, hash_key = self._migrating_slot(hash)
+        return buckets[hash_key]
+
+    def _find_for_update(self, key: object, hash: int = None) -> tuple:
+        """
+        Helper function for the operations that may add key, as for HashMap;
+        a key already in the cache counts as used
+        """
+        bucket, hash, node = super()._find_for_update(key, hash)
+        if node is not None:
+            self._touch(node)
+        return bucket, hash, node
+
+    def _store_new(self, bucket: LinkedList, hash: int, key: object, value: object) -> None:
+        """
+        Helper function to add a key that _find_for_update did not find to the bucket it returned,
+        evicting entries first to make room. An entry larger than max_bytes on its own is
+        not stored and counts as evicted.
+        """
+        size = self._size_of(key, value) if self._size_of is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            self._evictions += 1
+            return
+        if (self._max_entries is not None and self._size >= self._max_entries) or \
+                (self._max_bytes is not None and self._bytes + size > self._max_bytes):
+            self._evict_until(1, size)
+            # during an incremental resize the evictions move buckets to the new table,
+            # possibly the one bucket came from, so look it up again
+            bucket = self._bucket_of(hash)
+
+        if bucket.length() == 0:
+            self._occupy(bucket, hash)
+        node = CacheNode(key, value, None, hash, size)
+        bucket.insert_node(node)
+
+        # new entries join the group of frequency 1, the lowest one
+        group = self._groups.higher
+        if group.frequency != 1:
+            group = FrequencyGroup(1)
+            group.insert_after(self._groups)
+        group.append(node)
+
+        self._bytes += size
+        self._size += 1
+        self._version += 1
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Adds the key:value pair to the cache, replacing the value of a key already in it.
+        Evicts entries if the limits would be exceeded.
+        """
+        # the lookup of HashMap, touching the node here saves a call on every put
+        bucket, hash, node = hash_map_sc.HashMap._find_for_update(self, key)
+        if node is None:
+            self._store_new(bucket, hash, key, value)
+            return
+
+        self._touch(node)
+        node.value = value
+        self._recharge(node)
+
+    def put_many(self, pairs, expected_size: int = None) -> None:
+        """
+        Adds every key:value pair from an iterable of pairs, in order, evicting
+        earlier entries once the limits are reached
+        """
+        put = self.put
+        for key, value in pairs:
+            put(key, value)
+
+    def upsert(self, key: object, function: callable, default: object = None) -> object:
+        """
+        Replaces the value of key with function(value), adding key with function(default)
+        if it is not in the cache. Returns the new value. Evicts entries if the limits
+        would be exceeded. function must not modify the cache.
+        """
+        bucket, hash, node = self._find_for_update(key)
+        if node is None:
+            value = function(default)
+            self._store_new(bucket, hash, key, value)
+            return value
+        value = node.value = function(node.value)
+        self._recharge(node)
+        return value
+
+    def increment(self, key: object, delta: int = 1) -> int:
+        """
+        Adds delta to the value of key, starting from 0 if key is not in the cache.
+        Returns the new value. Evicts entries if the limits would be exceeded.
+        """
+        bucket, hash, node = self._find_for_update(key)
+        if node is None:
+            self._store_new(bucket, hash, key, delta)
+            return delta
+        value = node.value = node.value + delta
+        self._recharge(node)
+        return value
+
+    def get(self, key: object):
+        """
+        Returns the value related to the received key, counting a hit and a use of the
+        entry. Returns None, counting a miss, if key is not in the cache.
+        """
+        hash = self._hash_function(key)
+        node = self._bucket_of(hash).contains(key, hash)
+        if node is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._touch(node)
+        return node.value
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Returns an array with the value of every key in keys, in order,
+        using default for keys that are not in the cache. Hits are used in order.
+        """
+        result = DynamicArray()
+        for node in self._find_many(as_list(keys)):
+            if node is None:
+                self._misses += 1
+                result.append(default)
+            else:
+                self._hits += 1
+                self._touch(node)
+                result.append(node.value)
+        return result
+
+    def remove(self, key: object) -> None:
+        """
+        Receives a key and removes the key:value pair from the cache if it exists.
+        """
+        node = self._remove(key, self._hash_function(key))
+        if node is not None:
+            self._forget(node)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the cache. Keeps capacity and the hit, miss and eviction counts.
+        """
+        super().clear()
+        self._groups = FrequencyGroup(0)
+        self._bytes = 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU eviction")
+    print("------------")
+    cache = BoundedCache(eviction='lru', max_entries=3)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key.upper())
+    cache.get('a')
+    cache.put('d', 'D')
+    print(sorted(cache.keys()), cache.get('b'))
+
+    print("\nLFU eviction")
+    print("------------")
+    cache = BoundedCache(eviction='lfu', max_entries=3)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key.upper())
+    for key in ('a', 'a', 'b', 'c', 'c'):
+        cache.get(key)
+    cache.put('d', 'D')
+    print(sorted(cache.keys()), cache.get('b'))
+
+    print("\nmax_bytes")
+    print("---------")
+    cache = BoundedCache(max_bytes=1000, size_of=lambda key, value: len(value))
+    for i in range(10):
+        cache.put('key' + str(i), 'x' * 300)
+    cache.put('huge', 'x' * 2000)
+    print(cache.get_size(), cache.get_bytes(), cache.contains_key('huge'))
+    stats = cache.stats()
+    print(stats['hits'], stats['misses'], stats['evictions'])
+
+    # values growing in place are charged again, evicting to stay under max_bytes
+    cache = BoundedCache(max_bytes=1000, size_of=lambda key, value: len(value))
+    for i in range(3):
+        cache.put('key' + str(i), 'x' * 300)
+    cache.upsert('key1', lambda value: value * 2)
+    print(sorted(cache.keys()), cache.get_bytes())
+    cache.check_counters()
@@ -0,0 +1,159 @@
+# Description: Vectorized hashing and bucket assignment of key batches, using NumPy when it is installed.
+
+from itertools import islice
+
+from DS_include import FIBONACCI_MULTIPLIER, modulo_index, fibonacci_index, hash_function_1, hash_function_2
+from hash_functions import FNV_OFFSET_BASIS, FNV_PRIME, fnv1a_64
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# batches smaller than this are hashed one key at a time; NumPy's per call overhead would dominate
+MIN_BATCH = 32
+
+# largest padded code point matrix, in bytes, built at once; batches with a few very long
+# keys would otherwise allocate far more than the keys themselves take
+MAX_MATRIX_BYTES = 1 << 24
+
+# keys hashed at once by the bulk loads of the maps
+LOAD_BATCH = 4096
+
+# largest code point, which bounds the per character terms of hash_function_1 and 2
+_MAX_CODE_POINT = 0x10FFFF
+
+
+def batched(iterable, size: int):
+    """Yield lists of up to size consecutive items of iterable."""
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def code_point_matrix(keys: list) -> tuple:
+    """
+    Return (matrix, lengths) for a list of str keys: a uint32 array with one row of
+    code points per key, zero padded to the longest key, and the length of every key
+    """
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    width = max(int(lengths.max()), 1)
+    # fixed width unicode arrays store UCS-4, so the buffer already is the code point matrix
+    matrix = np.array(keys, dtype=f'<U{width}').view(np.uint32).reshape(len(keys), width)
+    return matrix, lengths
+
+
+def utf8_matrix(keys: list) -> tuple:
+    """
+    Return (matrix, lengths) for a list of str keys: a uint8 array with one row of
+    UTF-8 bytes per key, zero padded to the longest encoding, and the byte length of every key
+    """
+    encoded = [key.encode() for key in keys]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    width = max(int(lengths.max()), 1)
+    matrix = np.array(encoded, dtype=f'S{width}').view(np.uint8).reshape(len(encoded), width)
+    return matrix, lengths
+
+
+def hash_function_1_many(keys: list) -> list:
+    """hash_function_1 of every str key: the sum of its code points"""
+    matrix, _ = code_point_matrix(keys)
+    return matrix.sum(axis=1, dtype=np.uint64).tolist()
+
+
+def hash_function_2_many(keys: list) -> list:
+    """hash_function_2 of every str key: the sum of its code points weighted by position"""
+    matrix, _ = code_point_matrix(keys)
+    width = matrix.shape[1]
+    if _MAX_CODE_POINT * width * (width + 1) // 2 >= 1 << 64:
+        # long enough keys could overflow 64 bits, which Python ints never do
+        return [hash_function_2(key) for key in keys]
+    weights = np.arange(1, width + 1, dtype=np.uint64)
+    return (matrix.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64).tolist()
+
+
+def fnv1a_64_many(keys: list) -> list:
+    """
+    fnv1a_64 of every str key. The bytes are consumed one column at a time across
+    the whole batch, leaving each key's hash alone once its bytes run out.
+    """
+    matrix, lengths = utf8_matrix(keys)
+    hashes = np.full(len(keys), FNV_OFFSET_BASIS, dtype=np.uint64)
+    prime = np.uint64(FNV_PRIME)
+    for column in range(int(lengths.max())):
+        active = lengths > column
+        # uint64 arithmetic wraps around, which is the & MASK_64 of the scalar version
+        hashes = np.where(active, (hashes ^ matrix[:, column]) * prime, hashes)
+    return hashes.tolist()
+
+
+# scalar hash functions with a vectorized version giving the same results
+VECTORIZED = {
+    hash_function_1: hash_function_1_many,
+    hash_function_2: hash_function_2_many,
+    fnv1a_64: fnv1a_64_many,
+}
+
+
+def vectorized(function) -> bool:
+    """Return True if hash_many computes function for a batch at once."""
+    return HAVE_NUMPY and function in VECTORIZED
+
+
+def hash_many(function, keys: list) -> list:
+    """
+    Return function(key) for every key in keys. With NumPy installed, batches of
+    str keys are hashed at once by the vectorized version of hash_function_1,
+    hash_function_2 or fnv1a_64; anything else is hashed one key at a time.
+    """
+    many = VECTORIZED.get(function) if HAVE_NUMPY else None
+    if many is None or len(keys) < MIN_BATCH or not all(type(key) is str for key in keys):
+        return [function(key) for key in keys]
+    if len(keys) * max(map(len, keys)) * 4 > MAX_MATRIX_BYTES:
+        # split the batch rather than pad every key to one very long one
+        half = len(keys) // 2
+        if half < MIN_BATCH:
+            return [function(key) for key in keys]
+        return hash_many(function, keys[:half]) + hash_many(function, keys[half:])
+    return many(keys)
+
+
+def bucket_indices(hashes: list, capacity: int, power_of_two: bool = False) -> list:
+    """
+    Return the bucket of every hash in a table of capacity buckets, as modulo_index
+    (prime capacities) or fibonacci_index (power of two capacities) would
+    """
+    if not HAVE_NUMPY or len(hashes) < MIN_BATCH or min(hashes) < 0 or max(hashes) >= 1 << 64:
+        home = fibonacci_index if power_of_two else modulo_index
+        return [home(hash, capacity) for hash in hashes]
+
+    array = np.array(hashes, dtype=np.uint64)
+    if not power_of_two:
+        return (array % np.uint64(capacity)).tolist()
+    bits = capacity.bit_length() - 1
+    if bits == 0:
+        return [0] * len(hashes)
+    # the index is the top bits of the low 64 bits of hash * FIBONACCI_MULTIPLIER
+    return ((array * np.uint64(FIBONACCI_MULTIPLIER)) >> np.uint64(64 - bits)).tolist()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nVectorized hashes against the scalar functions")
+    print("----------------------------------------------")
+    keys = ['str' + str(i) for i in range(1000)] + ['', 'ünïcödé', '\U0001F600 emoji', 'x' * 300]
+    keys += ['key' + chr(code) for code in range(0, 0x3000, 7)]
+    print(f"NumPy available: {HAVE_NUMPY}")
+    for function in (hash_function_1, hash_function_2, fnv1a_64):
+        hashes = hash_many(function, keys)
+        print(f"{function.__name__:16} {hashes == [function(key) for key in keys]}")
+        for capacity, power_of_two in ((1009, False), (1024, True), (1, True)):
+            home = fibonacci_index if power_of_two else modulo_index
+            expected = [home(hash, capacity) for hash in hashes]
+            print(f"    buckets of {capacity:5} {bucket_indices(hashes, capacity, power_of_two) == expected}")
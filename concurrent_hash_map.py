@@ -0,0 +1,409 @@
+# Description: A thread-safe separate chaining hash map that stripes locks across its buckets.
+
+import threading
+from contextlib import contextmanager
+
+import hash_map_sc
+from DS_include import DynamicArray, LinkedList, sized_pairs, hash_function_1
+
+
+class ConcurrentHashMap(hash_map_sc.HashMap):
+    """
+    Separate chaining hash map that can be shared between threads.
+    Bucket i is guarded by lock i % stripes, so operations on keys in different
+    stripes run without waiting on each other. Resizing and whole-table operations
+    take the resize lock and then every stripe, in order.
+    Supported methods are those of hash_map_sc.HashMap plus put_if_absent and
+    compute; these, setdefault, upsert and increment run atomically.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 capacity_policy: str = 'prime',
+                 lazy_buckets: bool = False) -> None:
+        """
+        Initialize new ConcurrentHashMap with the given number of lock stripes.
+        Incremental resizing is not offered; a resize holds every stripe while it runs.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        super().__init__(capacity, function, capacity_policy, lazy_buckets)
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._resize_lock = threading.Lock()
+
+        # per stripe entry counts, each only changed under its own lock;
+        # _size is brought up to date while every stripe is held
+        self._counts = [0] * stripes
+        # per stripe changes to the number of occupied buckets, folded into
+        # _occupied while every stripe is held
+        self._occupied_deltas = [0] * stripes
+
+    def get_stripes(self) -> int:
+        """
+        Return number of lock stripes
+        """
+        return self._stripes
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._counts)
+
+    def table_load(self) -> float:
+        """
+        Returns the current load factor of the hash table
+        """
+        return self.get_size() / self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @contextmanager
+    def _all_locked(self):
+        """
+        Helper context manager holding the resize lock and every stripe,
+        with _size and _occupied up to date
+        """
+        with self._resize_lock:
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                self._size = sum(self._counts)
+                self._occupied += sum(self._occupied_deltas)
+                self._occupied_deltas = [0] * self._stripes
+                yield
+            finally:
+                for lock in reversed(self._locks):
+                    lock.release()
+
+    def _lock_bucket(self, hash: int) -> tuple:
+        """
+        Helper function to acquire the stripe of the bucket holding hash.
+        Returns (bucket index, stripe); the caller releases the stripe's lock.
+        A resize may change the capacity before the lock is granted, in which
+        case the bucket is worked out again.
+        """
+        while True:
+            capacity = self._capacity
+            hash_key = self._home(hash, capacity)
+            stripe = hash_key % self._stripes
+            lock = self._locks[stripe]
+            lock.acquire()
+            if capacity == self._capacity:
+                return hash_key, stripe
+            lock.release()
+
+    def _find_node(self, key: str) -> object:
+        """
+        Helper function returning the node holding key, or None if absent
+        """
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_list[hash_key]
+            return bucket.contains(key, hash) if bucket is not None else None
+        finally:
+            self._locks[stripe].release()
+
+    def _grow_if_needed(self) -> None:
+        """
+        Helper function to grow the table once the load gets to the policy's max_load.
+        Threads that raced here behind another resize find the load already fixed.
+        """
+        if self.get_size() >= self._max_load * self._capacity:
+            with self._all_locked():
+                if self._size >= self._max_load * self._capacity:
+                    super().resize_table(self._policy.grown(self._capacity))
+
+    def _bucket_at(self, hash_key: int) -> LinkedList:
+        """
+        Helper function returning the bucket at hash_key, allocating a lazy one.
+        The caller holds the bucket's stripe.
+        """
+        bucket = self._bucket_list[hash_key]
+        if bucket is None:
+            bucket = self._bucket_list[hash_key] = LinkedList()
+        return bucket
+
+    def _insert(self, stripe: int, bucket: LinkedList, hash: int, key: str, value: object) -> None:
+        """
+        Helper function to add a key known to be absent to bucket.
+        The caller holds the bucket's stripe.
+        """
+        if bucket.length() == 0:
+            self._occupied_deltas[stripe] += 1
+        bucket.insert(key, value, hash)
+        self._counts[stripe] += 1
+        self._version += 1
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds the key:value pair to the hash map. If the key already exists then it's value will be replaced.
+        Updates capacity if needed.
+        """
+        self._grow_if_needed()
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_at(hash_key)
+            node = bucket.contains(key, hash)
+            if node is not None:
+                node.value = value
+            else:
+                self._insert(stripe, bucket, hash, key, value)
+        finally:
+            self._locks[stripe].release()
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Adds the key:value pair only if key is not in the hash map yet.
+        Returns the value already stored for key, or None if value was added.
+        """
+        self._grow_if_needed()
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_at(hash_key)
+            node = bucket.contains(key, hash)
+            if node is not None:
+                return node.value
+            self._insert(stripe, bucket, hash, key, value)
+            return None
+        finally:
+            self._locks[stripe].release()
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Atomically returns the value of key, adding key with the default value first
+        if it is not in the hash map.
+        """
+        self._grow_if_needed()
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_at(hash_key)
+            node = bucket.contains(key, hash)
+            if node is not None:
+                return node.value
+            self._insert(stripe, bucket, hash, key, default)
+            return default
+        finally:
+            self._locks[stripe].release()
+
+    def upsert(self, key: str, function: callable, default: object = None) -> object:
+        """
+        Atomically replaces the value of key with function(value), adding key with
+        function(default) if it is absent. Returns the new value.
+        function runs under a lock and must not use the map.
+        """
+        self._grow_if_needed()
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_at(hash_key)
+            node = bucket.contains(key, hash)
+            if node is not None:
+                node.value = function(node.value)
+                return node.value
+            value = function(default)
+            self._insert(stripe, bucket, hash, key, value)
+            return value
+        finally:
+            self._locks[stripe].release()
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Atomically adds delta to the value of key, starting from 0 if key is absent.
+        Returns the new value.
+        """
+        self._grow_if_needed()
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_at(hash_key)
+            node = bucket.contains(key, hash)
+            if node is not None:
+                node.value += delta
+                return node.value
+            self._insert(stripe, bucket, hash, key, delta)
+            return delta
+        finally:
+            self._locks[stripe].release()
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Atomically replaces the value of key with function(key, current value),
+        the current value being None if key is absent. A result of None removes the key.
+        Returns the new value. function runs under a lock and must not use the map.
+        """
+        self._grow_if_needed()
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_list[hash_key]
+            node = bucket.contains(key, hash) if bucket is not None else None
+            value = function(key, node.value if node is not None else None)
+
+            if value is None:
+                if node is not None:
+                    bucket.remove(key, hash)
+                    self._counts[stripe] -= 1
+                    self._version += 1
+                    if bucket.length() == 0:
+                        self._occupied_deltas[stripe] -= 1
+                        if self._lazy_buckets:
+                            self._bucket_list[hash_key] = None
+            elif node is not None:
+                node.value = value
+            else:
+                self._insert(stripe, self._bucket_at(hash_key), hash, key, value)
+            return value
+        finally:
+            self._locks[stripe].release()
+
+    def put_many(self, pairs, expected_size: int = None) -> None:
+        """
+        Adds every key:value pair from an iterable of pairs, sizing the table once up front.
+        The pairs are added one at a time, so other threads may see part of them.
+        """
+        pairs, expected_size = sized_pairs(pairs, expected_size)
+
+        capacity = self._policy.capacity_for(self.get_size() + expected_size)
+        if capacity > self._capacity:
+            self.resize_table(capacity)
+
+        put = self.put
+        for key, value in pairs:
+            put(key, value)
+
+    def get(self, key: str):
+        """
+        Returns the value related to the received key. Returns None if key in not
+        in the hash map.
+        """
+        node = self._find_node(key)
+        return node.value if node is not None else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns true if the key is in the hash map.
+        """
+        return self._find_node(key) is not None
+
+    def _find_many(self, keys: list) -> list:
+        """
+        Helper function returning the node holding every key in keys, or None if absent.
+        Each key is looked up under its own stripe, so the batch is not one snapshot.
+        """
+        find_node = self._find_node
+        return [find_node(key) for key in keys]
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key and removes the key:value pair from the hash map if it exists.
+        """
+        hash = self._hash_function(key)
+        hash_key, stripe = self._lock_bucket(hash)
+        try:
+            bucket = self._bucket_list[hash_key]
+            if bucket is not None and bucket.remove(key, hash):
+                self._counts[stripe] -= 1
+                self._version += 1
+                if bucket.length() == 0:
+                    self._occupied_deltas[stripe] -= 1
+                    # lazy buckets go back to None once they are empty
+                    if self._lazy_buckets:
+                        self._bucket_list[hash_key] = None
+        finally:
+            self._locks[stripe].release()
+
+    # ------------------------------------------------------------------ #
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table while holding every stripe.
+        """
+        with self._all_locked():
+            super().resize_table(new_capacity)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. Keeps capacity.
+        """
+        with self._all_locked():
+            super().clear()
+            self._counts = [0] * self._stripes
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        """
+        with self._all_locked():
+            return super().empty_buckets()
+
+    def occupancy(self) -> dict:
+        """
+        Returns the occupancy counters of the hash map, taken as a single snapshot.
+        """
+        with self._all_locked():
+            return super().occupancy()
+
+    def check_counters(self) -> None:
+        """
+        Checks the counters against a full scan while holding every stripe.
+        """
+        with self._all_locked():
+            super().check_counters()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns an unordered dynamic array of the key:value pairs in the hash map,
+        taken as a single snapshot.
+        """
+        with self._all_locked():
+            return super().get_keys_and_values()
+
+    def get_buckets(self) -> DynamicArray:
+        """Returns buckets in the hash map (None for unused buckets with lazy_buckets)"""
+        with self._all_locked():
+            return super().get_buckets()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        with self._all_locked():
+            return super().__str__()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nincrement from several threads")
+    print("------------------------------")
+    m = ConcurrentHashMap(11, hash_function_1)
+
+    def worker():
+        for i in range(5000):
+            m.increment('key' + str(i % 100))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get('key0'), sum(value for _, value in m.get_keys_and_values()))
+
+    print("\nput_if_absent and compute")
+    print("-------------------------")
+    m = ConcurrentHashMap(11, hash_function_1)
+    print(m.put_if_absent('key1', 10), m.put_if_absent('key1', 20), m.get('key1'))
+    print(m.compute('key1', lambda key, value: value * 3), m.get('key1'))
+    print(m.compute('key2', lambda key, value: 1 if value is None else value + 1), m.get('key2'))
+    print(m.compute('key1', lambda key, value: None), m.contains_key('key1'), m.get_size())
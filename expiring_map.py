@@ -0,0 +1,213 @@
+# Description: Per key time to live for both HashMaps, expired through a timing wheel.
+
+import time
+
+import hash_map_oa
+import hash_map_sc
+from DS_include import DynamicArray, as_list, hash_function_2
+from timing_wheel import TimingWheel
+
+
+class ExpiringMixin:
+    """
+    Adds per key time to live to a HashMap: put(key, value, ttl=seconds).
+    A key whose ttl has run out is removed the next time it is looked up or updated,
+    and expire_due removes every expired key in amortized O(1) per key through a
+    timing wheel, without scanning the table; call it periodically, for example
+    from an event loop. Until then, expired keys that were not looked up still
+    count in get_size and show up when iterating.
+    A put without ttl, like remove, drops any ttl the key had.
+    Mixed in before the map class: class ExpiringHashMap(ExpiringMixin, HashMap).
+    """
+
+    def __init__(self, *args, tick: float = 1.0, wheel_slots: int = 64, wheel_levels: int = 4,
+                 clock: callable = time.monotonic, **kwargs) -> None:
+        """
+        Initialize the map from the remaining arguments. Expiry is checked against
+        clock() readings. expire_due keeps the deadlines on a wheel of wheel_levels
+        levels of wheel_slots slots, the lowest level slots spanning tick seconds.
+        """
+        super().__init__(*args, **kwargs)
+        self._clock = clock
+        self._tick = tick
+        self._wheel_slots = wheel_slots
+        self._wheel_levels = wheel_levels
+        self._wheel = TimingWheel(tick, wheel_slots, wheel_levels, clock())
+        # timer of every key that has a ttl
+        self._timers = {}
+
+    def _set_ttl(self, key: object, ttl: float) -> None:
+        """Helper function to replace the ttl of key, dropping it if ttl is None."""
+        timer = self._timers.pop(key, None) if self._timers else None
+        if timer is not None:
+            self._wheel.cancel(timer)
+        if ttl is not None:
+            self._timers[key] = self._wheel.schedule(key, self._clock() + ttl)
+
+    def _expire_key(self, key: object) -> None:
+        """Helper function removing key if its ttl has run out."""
+        timer = self._timers.get(key) if self._timers else None
+        if timer is not None and timer.deadline <= self._clock():
+            del self._timers[key]
+            self._wheel.cancel(timer)
+            super().remove(key)
+
+    def get_ttl(self, key: object) -> float:
+        """
+        Return the seconds key has left to live, or None if it has no ttl or is not in the map
+        """
+        self._expire_key(key)
+        timer = self._timers.get(key)
+        return timer.deadline - self._clock() if timer is not None else None
+
+    def expire_due(self, now: float = None) -> int:
+        """
+        Remove every key whose ttl ran out by now (by default the clock's current reading).
+        Returns the number of keys removed.
+        """
+        if now is None:
+            now = self._clock()
+        expired = 0
+        for timer in self._wheel.advance(now):
+            # the timer of a key is only ever replaced after being cancelled, but check anyway
+            if self._timers.get(timer.key) is timer:
+                del self._timers[timer.key]
+                super().remove(timer.key)
+                expired += 1
+        return expired
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: object, value: object, ttl: float = None) -> None:
+        """
+        Adds the key:value pair to the hash map, to be removed after ttl seconds
+        if ttl is given. Replaces the value and the ttl of a key already in the map.
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        super().put(key, value)
+        self._set_ttl(key, ttl)
+
+    def put_many(self, pairs, expected_size: int = None, ttl: float = None) -> None:
+        """
+        Adds every key:value pair from an iterable of pairs, all with the same ttl if given
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        # the pairs are gone over twice, so a generator is collected even with expected_size
+        pairs = as_list(pairs)
+        super().put_many(pairs, len(pairs) if expected_size is None else expected_size)
+        for key, _ in pairs:
+            self._set_ttl(key, ttl)
+
+    def get(self, key: object) -> object:
+        """
+        Returns the value of key, or None if it is not in the hash map or has expired
+        """
+        self._expire_key(key)
+        return super().get(key)
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Returns True if key is in the hash map and has not expired
+        """
+        self._expire_key(key)
+        return super().contains_key(key)
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Returns an array with the value of every key in keys, in order,
+        using default for keys that are not in the hash map or have expired
+        """
+        keys = as_list(keys)
+        for key in keys:
+            self._expire_key(key)
+        return super().get_many(keys, default)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns an array telling, in order, whether each key in keys is in the hash map
+        and has not expired
+        """
+        keys = as_list(keys)
+        for key in keys:
+            self._expire_key(key)
+        return super().contains_many(keys)
+
+    def setdefault(self, key: object, default: object = None) -> object:
+        """
+        Returns the value of key, adding it with the default value and no ttl first
+        if it is not in the hash map or has expired
+        """
+        self._expire_key(key)
+        return super().setdefault(key, default)
+
+    def upsert(self, key: object, function: callable, default: object = None) -> object:
+        """
+        Replaces the value of key with function(value), as HashMap.upsert does;
+        an expired key counts as absent. The ttl of the key is kept.
+        """
+        self._expire_key(key)
+        return super().upsert(key, function, default)
+
+    def increment(self, key: object, delta: int = 1) -> int:
+        """
+        Adds delta to the value of key, starting from 0 if it is absent or has expired.
+        The ttl of the key is kept.
+        """
+        self._expire_key(key)
+        return super().increment(key, delta)
+
+    def remove(self, key: object) -> None:
+        """
+        Removes key and its ttl from the hash map if it is there.
+        """
+        super().remove(key)
+        self._set_ttl(key, None)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map and every ttl. Keeps capacity.
+        """
+        super().clear()
+        self._wheel = TimingWheel(self._tick, self._wheel_slots, self._wheel_levels, self._clock())
+        self._timers = {}
+
+
+class ExpiringHashMapOA(ExpiringMixin, hash_map_oa.HashMap):
+    """Open addressing HashMap with per key time to live; see ExpiringMixin."""
+
+
+class ExpiringHashMapSC(ExpiringMixin, hash_map_sc.HashMap):
+    """Separate chaining HashMap with per key time to live; see ExpiringMixin."""
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    class ManualClock:
+        """Clock that only moves when told to."""
+
+        def __init__(self) -> None:
+            self.now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    for cls in (ExpiringHashMapOA, ExpiringHashMapSC):
+        print(f"\n{cls.__name__}")
+        print("-----------------")
+        clock = ManualClock()
+        m = cls(11, hash_function_2, clock=clock)
+        for i in range(10):
+            m.put('session' + str(i), i, ttl=10 * (i + 1))
+        m.put('forever', 'value')
+        clock.now = 25
+        print(m.get('session0'), m.get('session5'), m.get_ttl('session5'), m.get_size())
+        print(m.expire_due(), m.get_size(), m.contains_key('session2'))
+        clock.now = 1000
+        print(m.expire_due(), m.get_size(), m.get('forever'))
+        # a generator with expected_size still gets every ttl
+        m.put_many((('batch' + str(i), i) for i in range(3)), 3, ttl=5)
+        print(m.get_ttl('batch2'), m.get_size())
@@ -0,0 +1,95 @@
+# Description: Frequency counting and find_mode over large DynamicArrays, sharded across processes.
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from DS_include import DynamicArray, as_list, hash_function_1
+from hash_map_sc import HashMap
+
+
+def _count_shard(keys: list, function: callable) -> list:
+    """
+    Count the keys of one shard into a local map and return its (key, count) pairs.
+    Runs in a worker process; plain pairs pickle far cheaper than the map itself.
+    """
+    counts = HashMap(len(keys), function)
+    increment = counts.increment
+    for key in keys:
+        increment(key)
+    return list(counts.items())
+
+
+def count_frequencies(da, workers: int = None, function: callable = hash_function_1,
+                      min_shard: int = 50000) -> HashMap:
+    """
+    Returns a HashMap of key: number of occurrences for the keys in da (a DynamicArray
+    or list). The input is split into one contiguous shard per worker process, each
+    counted into its own map, and the partial counts are merged. Inputs too small to
+    give every worker min_shard keys use fewer workers, down to counting in-process.
+    """
+    keys = as_list(da)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shards = max(1, min(workers, len(keys) // min_shard))
+
+    if shards == 1:
+        partials = [_count_shard(keys, function)]
+    else:
+        size = -(-len(keys) // shards)
+        with ProcessPoolExecutor(max_workers=shards) as executor:
+            partials = list(executor.map(_count_shard,
+                                         [keys[start:start + size] for start in range(0, len(keys), size)],
+                                         [function] * shards))
+
+    # the largest partial is usually close to the final size, so presize for it
+    counts = HashMap(max(len(partial) for partial in partials), function)
+    increment = counts.increment
+    for partial in partials:
+        for key, count in partial:
+            increment(key, count)
+    return counts
+
+
+def top_k(counts: HashMap, k: int) -> DynamicArray:
+    """
+    Returns the k most frequent (key, count) pairs of a count map, most frequent first
+    """
+    return DynamicArray(heapq.nlargest(k, counts.items(), key=lambda item: item[1]))
+
+
+def parallel_find_mode(da, workers: int = None, top: int = None,
+                       function: callable = hash_function_1) -> tuple:
+    """
+    Receives an unsorted or sorted dynamic array and returns the mode(s) and frequency
+    as a tuple: ([mode(s)], freq), counting with count_frequencies. Modes are in no
+    particular order. With top set, a DynamicArray of the top most frequent
+    (key, count) pairs is returned as a third element.
+    """
+    counts = count_frequencies(da, workers, function)
+
+    # one pass for the highest frequency, one to collect every key that has it
+    freq = max(counts.values(), default=0)
+    mode = DynamicArray([key for key, count in counts.items() if count == freq])
+
+    if top is None:
+        return mode, freq
+    return mode, freq, top_k(counts, top)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nparallel_find_mode example 1")
+    print("----------------------------")
+    da = DynamicArray(["apple", "apple", "grape", "melon", "melon", "peach"])
+    mode, frequency = parallel_find_mode(da)
+    print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}")
+
+    print("\nparallel_find_mode example 2, sharded across 4 processes")
+    print("--------------------------------------------------------")
+    da = DynamicArray(['token' + str(i % 997 * i % 1009) for i in range(400000)])
+    mode, frequency, top = parallel_find_mode(da, workers=4, top=5)
+    print(f"Mode : {mode}, Frequency: {frequency}")
+    print(f"Top 5: {top}")
@@ -0,0 +1,166 @@
+# Description: Hash functions that can be passed as the function argument of either HashMap.
+
+import random
+
+from DS_include import DynamicArray, FIBONACCI_MULTIPLIER, hash_function_1, hash_function_2
+
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+FNV_OFFSET_BASIS = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+
+def _to_bytes(key) -> bytes:
+    """Return the UTF-8 bytes of a str key (other keys are converted with str first)"""
+    if isinstance(key, bytes):
+        return key
+    if not isinstance(key, str):
+        key = str(key)
+    return key.encode()
+
+
+class SeededHash:
+    """
+    Wrapper over Python's built-in hash() with a per-map seed.
+    Built-in string hashing runs in C and is cached on the str object, which makes
+    this the fastest choice; the seed keeps different maps from sharing collisions.
+    Note that str hashes change between interpreter runs unless PYTHONHASHSEED is set.
+    """
+
+    def __init__(self, seed: int = None) -> None:
+        """Initialize with the given seed, or a random one."""
+        self._seed = random.getrandbits(64) if seed is None else seed
+
+    def __call__(self, key) -> int:
+        """Return the seeded hash of key."""
+        return hash((self._seed, key))
+
+    def get_seed(self) -> int:
+        """Return the seed of the hash function"""
+        return self._seed
+
+
+def fnv1a_64(key) -> int:
+    """64 bit FNV-1a hash of the key's UTF-8 bytes"""
+    hash = FNV_OFFSET_BASIS
+    for byte in _to_bytes(key):
+        hash = ((hash ^ byte) * FNV_PRIME) & MASK_64
+    return hash
+
+
+def int_hash(key: int) -> int:
+    """
+    Multiplicative hash of an int key: its low 64 bits times FIBONACCI_MULTIPLIER,
+    keeping the top 63 bits of the 64 bit product, which depend on every bit of the key
+    """
+    return ((key & MASK_64) * FIBONACCI_MULTIPLIER & MASK_64) >> 1
+
+
+def _rotate_left(value: int, bits: int) -> int:
+    """Rotate a 64 bit value left by bits"""
+    return ((value << bits) | (value >> (64 - bits))) & MASK_64
+
+
+class SipHash:
+    """
+    SipHash-2-4 keyed hash of the key's UTF-8 bytes.
+    Resistant to crafted collisions as long as the 128 bit secret stays private,
+    and stable across interpreter runs for a fixed secret.
+    """
+
+    def __init__(self, secret: bytes = None) -> None:
+        """Initialize with a 16 byte secret, or a random one."""
+        if secret is None:
+            secret = random.getrandbits(128).to_bytes(16, 'little')
+        if len(secret) != 16:
+            raise ValueError("SipHash secret must be 16 bytes")
+        self._k0 = int.from_bytes(secret[:8], 'little')
+        self._k1 = int.from_bytes(secret[8:], 'little')
+
+    @staticmethod
+    def _rounds(v0: int, v1: int, v2: int, v3: int, count: int) -> tuple:
+        """Apply count SipRounds to the state"""
+        for _ in range(count):
+            v0 = (v0 + v1) & MASK_64
+            v1 = _rotate_left(v1, 13) ^ v0
+            v0 = _rotate_left(v0, 32)
+            v2 = (v2 + v3) & MASK_64
+            v3 = _rotate_left(v3, 16) ^ v2
+            v0 = (v0 + v3) & MASK_64
+            v3 = _rotate_left(v3, 21) ^ v0
+            v2 = (v2 + v1) & MASK_64
+            v1 = _rotate_left(v1, 17) ^ v2
+            v2 = _rotate_left(v2, 32)
+        return v0, v1, v2, v3
+
+    def __call__(self, key) -> int:
+        """Return the SipHash-2-4 of key."""
+        data = _to_bytes(key)
+        v0 = self._k0 ^ 0x736F6D6570736575
+        v1 = self._k1 ^ 0x646F72616E646F6D
+        v2 = self._k0 ^ 0x6C7967656E657261
+        v3 = self._k1 ^ 0x7465646279746573
+
+        # whole 8 byte words
+        tail = len(data) - len(data) % 8
+        for start in range(0, tail, 8):
+            word = int.from_bytes(data[start:start + 8], 'little')
+            v3 ^= word
+            v0, v1, v2, v3 = self._rounds(v0, v1, v2, v3, 2)
+            v0 ^= word
+
+        # remaining bytes with the length in the top byte
+        word = int.from_bytes(data[tail:], 'little') | ((len(data) & 0xFF) << 56)
+        v3 ^= word
+        v0, v1, v2, v3 = self._rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+
+        v2 ^= 0xFF
+        v0, v1, v2, v3 = self._rounds(v0, v1, v2, v3, 4)
+        return v0 ^ v1 ^ v2 ^ v3
+
+
+def collision_report(keys: DynamicArray, functions: dict, capacity: int) -> DynamicArray:
+    """
+    Hash every key with each of the named functions and return a DynamicArray of
+    (name, full hash collisions, buckets used, largest bucket) tuples
+    for a table of the given capacity
+    """
+    result = DynamicArray()
+    for name, function in functions.items():
+        hashes = set()
+        buckets = {}
+        for index in range(keys.length()):
+            hash = function(keys[index])
+            hashes.add(hash)
+            bucket = hash % capacity
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        result.append((name, keys.length() - len(hashes), len(buckets), max(buckets.values(), default=0)))
+    return result
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSipHash-2-4 reference vector")
+    print("----------------------------")
+    siphash = SipHash(bytes(range(16)))
+    print(hex(siphash(bytes(range(15)))), hex(siphash(bytes(range(15)))) == '0xa129ca6149be45e5')
+
+    print("\nCollision report")
+    print("----------------")
+    keys = DynamicArray(['str' + str(i) for i in range(20000)])
+    functions = {
+        'hash_function_1': hash_function_1,
+        'hash_function_2': hash_function_2,
+        'seeded builtin': SeededHash(),
+        'fnv1a_64': fnv1a_64,
+        'siphash24': SipHash(),
+    }
+    capacity = 40009
+    report = collision_report(keys, functions, capacity)
+    print(f"{keys.length()} keys, {capacity} buckets")
+    for index in range(report.length()):
+        name, collisions, used, largest = report[index]
+        print(f"{name:16} collisions {collisions:6}   buckets used {used:6}   largest bucket {largest:5}")
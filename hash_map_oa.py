@@ -1,34 +1,324 @@
 # Description: A hash map ADT that uses open addressing for collisions.
 
-from DS_include import (DynamicArray, DynamicArrayException, HashEntry,
+import time
+
+from DS_include import (DynamicArray, EntryStorage, ArrayStorage, IntArrayStorage,
+                        KeysView, ValuesView, ItemsView,
+                        EMPTY, TOMBSTONE, HASH_MASK, FIBONACCI_MULTIPLIER, CAPACITY_POLICIES,
+                        next_power_of_two, modulo_index, fibonacci_index, sized_pairs, as_list,
                         hash_function_1, hash_function_2)
+from hash_functions import int_hash
+from snapshot import write_snapshot, read_snapshot
+from map_stats import MapStats
+from load_policy import LoadPolicy
+from bulk_hash import LOAD_BATCH, batched, vectorized, hash_many, bucket_indices
+
+# key whose hash is saved in snapshots to check the hash function they are loaded with
+SNAPSHOT_CHECK_KEY = 'snapshot'
+
+# bucket storage engines selectable through the storage argument of HashMap
+STORAGE_ENGINES = {
+    'entry': EntryStorage,
+    'array': ArrayStorage,
+}
+
+
+class LinearProbing:
+    """
+    Probe consecutive buckets, wrapping around at the end of the table
+    """
+    name = 'linear'
+    robin_hood = False
+
+    def probe(self, start: int, hash: int, capacity: int, key: str):
+        """Yield the capacity bucket indices probed for a key whose home bucket is start."""
+        index = start
+        for _ in range(capacity):
+            yield index
+            index += 1
+            if index == capacity:
+                index = 0
+
+
+class QuadraticProbing:
+    """
+    Probe start + k^2 for k = 0, 1, 2, ...
+    The squares are built incrementally from odd numbers, so no power is computed per step.
+    Only suitable for prime capacities, where the first half of the sequence is all distinct.
+    """
+    name = 'quadratic'
+    robin_hood = False
+
+    def probe(self, start: int, hash: int, capacity: int, key: str):
+        """Yield the capacity bucket indices probed for a key whose home bucket is start."""
+        yield start
+        offset = 0
+        for step in range(1, capacity):
+            # k^2 = (k - 1)^2 + 2k - 1
+            offset += 2 * step - 1
+            yield (start + offset) % capacity
+
+
+class TriangularProbing:
+    """
+    Probe start + k(k + 1) / 2 for k = 0, 1, 2, ... by adding k at step k.
+    Visits every bucket of a power of two capacity table.
+    """
+    name = 'triangular'
+    robin_hood = False
+
+    def probe(self, start: int, hash: int, capacity: int, key: str):
+        """Yield the capacity bucket indices probed for a key whose home bucket is start."""
+        index = start
+        for step in range(1, capacity + 1):
+            yield index
+            index = (index + step) % capacity
+
+
+class DoubleHashing:
+    """
+    Probe start + k * step, where step comes from a second hash of the key.
+    Without a second hash function the step is derived by scrambling the
+    cached hash, so rehashing never calls a hash function again.
+    """
+    name = 'double'
+    robin_hood = False
+
+    def __init__(self, function=None) -> None:
+        """Initialize with an optional second hash function."""
+        self._function = function
+
+    def probe(self, start: int, hash: int, capacity: int, key: str):
+        """Yield the capacity bucket indices probed for a key whose home bucket is start."""
+        if self._function is not None:
+            second = self._function(key)
+        else:
+            # multiplicative scramble, keeping the high bits
+            second = (hash * FIBONACCI_MULTIPLIER & 0xFFFFFFFFFFFFFFFF) >> 32
+        if capacity & (capacity - 1) == 0:
+            # with a power of two capacity every odd step visits every bucket
+            step = (second % capacity) | 1
+        else:
+            # with a prime capacity every step in [1, capacity - 1] visits every bucket
+            step = 1 + second % (capacity - 1)
+        index = start
+        for _ in range(capacity):
+            yield index
+            index = (index + step) % capacity
+
+
+class RobinHoodProbing(LinearProbing):
+    """
+    Linear probing where an inserted key takes the bucket of any entry that is
+    closer to its home bucket, keeping probe distances even. Lookups stop as soon as
+    they pass an entry closer to home than the key would be, and removals shift the
+    following entries back instead of leaving tombstones.
+    """
+    name = 'robin_hood'
+    robin_hood = True
+
+
+# probing strategies selectable by name through the probing argument of HashMap
+PROBING_STRATEGIES = {
+    'linear': LinearProbing,
+    'quadratic': QuadraticProbing,
+    'triangular': TriangularProbing,
+    'double': DoubleHashing,
+    'robin_hood': RobinHoodProbing,
+}
+
+# index k + 1 = index k + a * (k + 1) + b for the strategies whose probe sequence
+# IntHashMap computes inline instead of running the probe generator
+INLINED_PROBE_STEPS = {
+    LinearProbing: (0, 1),
+    QuadraticProbing: (2, -1),
+    TriangularProbing: (1, 0),
+}
+
+
+class CountingProbing:
+    """
+    Wraps the probing strategy of an instrumented HashMap, adding every bucket
+    it yields to the probe counter of a MapStats
+    """
+
+    def __init__(self, probing, stats: MapStats) -> None:
+        """Initialize around a probing strategy instance."""
+        self.probing = probing
+        self.name = probing.name
+        self.robin_hood = probing.robin_hood
+        self._stats = stats
+
+    def probe(self, start: int, hash: int, capacity: int, key: str):
+        """Yield the bucket indices of the wrapped strategy, counting each one."""
+        stats = self._stats
+        for index in self.probing.probe(start, hash, capacity, key):
+            stats.probes += 1
+            yield index
+
+
+class HashMapIterator:
+    """
+    Iterator over the live buckets of a HashMap, independent of any other iterator.
+    kind selects what is yielded: 'entries' (HashEntry objects, copies for the array
+    engine), 'keys', 'values' or 'items' ((key, value) tuples).
+    Raises RuntimeError if the map is changed structurally while iterating.
+    """
+
+    __slots__ = ('_map', '_hash_at', '_extract', '_index', '_capacity', '_version')
+
+    def __init__(self, hash_map: "HashMap", kind: str = 'entries') -> None:
+        """Initialize the iterator at the first bucket of hash_map."""
+        hash_map._finish_resize()
+        storage = hash_map._storage
+        if kind == 'entries':
+            self._extract = storage.entry_at
+        elif kind == 'keys':
+            self._extract = storage.key_at
+        elif kind == 'values':
+            self._extract = storage.value_at
+        elif kind == 'items':
+            key_at, value_at = storage.key_at, storage.value_at
+            self._extract = lambda index: (key_at(index), value_at(index))
+        else:
+            raise ValueError(f"unknown iterator kind {kind!r}")
+
+        self._map = hash_map
+        self._hash_at = storage.hash_at
+        self._index = 0
+        self._capacity = storage.length()
+        self._version = hash_map._version
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> object:
+        """Obtain the next live entry and advance the iterator."""
+        if self._map._version != self._version:
+            raise RuntimeError("hash map changed during iteration")
+
+        hash_at, index, capacity = self._hash_at, self._index, self._capacity
+        # empty buckets and tombstones both hold a negative sentinel hash
+        while index < capacity and hash_at(index) < 0:
+            index += 1
+        if index >= capacity:
+            self._index = index
+            raise StopIteration
+
+        self._index = index + 1
+        return self._extract(index)
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+
+    # key hashed into snapshots to check the hash function they are loaded with
+    _check_key = SNAPSHOT_CHECK_KEY
+
+    def __init__(self, capacity: int, function, compact_threshold: float = 0.75,
+                 storage: str = 'entry', probing=None,
+                 capacity_policy: str = 'prime', incremental_resize: bool = False,
+                 resize_batch: int = 8, instrument=False, debug: bool = False,
+                 load_policy: LoadPolicy = None) -> None:
         """
-        Initialize new HashMap that uses
-        quadratic probing for collision resolution
+        Initialize new HashMap that uses open addressing for collision resolution.
+        probing is the name of one of PROBING_STRATEGIES or a strategy instance;
+        by default quadratic probing is used with prime capacities and
+        triangular probing with power of two capacities.
+        capacity_policy is 'prime' (hash % capacity indexing) or 'power_of_two'
+        (Fibonacci scrambled hash & (capacity - 1) indexing).
+        The table is compacted once live entries plus tombstones fill
+        compact_threshold of the buckets.
+        storage selects the bucket layout: 'entry' keeps a HashEntry object per bucket,
+        'array' keeps hashes, keys and values in parallel arrays.
+        With incremental_resize a growing put only swaps in the larger table;
+        the entries of the old one are moved over resize_batch buckets at a time
+        by the following put, get and remove calls.
+        With instrument (True, or a MapStats to use) probes per operation, resizes
+        and compactions are recorded and reported by stats().
+        With debug, empty_buckets and occupancy check the counters they read
+        against a full scan of the table.
+        load_policy sets the load factor the table grows at (0.5 by default, must be
+        under 1 and no higher than compact_threshold), the growth factor, shrinking
+        after removes and the number of keys to size the table for up front.
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if not 0 < compact_threshold <= 1:
+            raise ValueError("compact_threshold must be in (0, 1]")
+        policy = (load_policy or LoadPolicy()).resolve(0.5, 1)
+        if policy.max_load > compact_threshold:
+            raise ValueError("max_load must not be above compact_threshold")
+        if resize_batch < 1:
+            raise ValueError("resize_batch must be at least 1")
+        if storage not in STORAGE_ENGINES:
+            raise ValueError(f"unknown storage engine {storage!r}")
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(f"unknown capacity policy {capacity_policy!r}")
+        self._power_of_two = capacity_policy == 'power_of_two'
+        self._home = fibonacci_index if self._power_of_two else modulo_index
+
+        if probing is None:
+            probing = 'triangular' if self._power_of_two else 'quadratic'
+        if isinstance(probing, str):
+            if probing not in PROBING_STRATEGIES:
+                raise ValueError(f"unknown probing strategy {probing!r}")
+            probing = PROBING_STRATEGIES[probing]()
+        if isinstance(probing, QuadraticProbing) and self._power_of_two:
+            raise ValueError("quadratic probing does not reach every bucket of a power of two table")
+
+        # statistics of an instrumented map, None otherwise
+        if instrument and not isinstance(instrument, MapStats):
+            instrument = MapStats()
+        self._stats = instrument or None
+        self._debug = debug
+        if self._stats is not None:
+            probing = CountingProbing(probing, self._stats)
+        self._probing = probing
+
+        self._storage_engine = STORAGE_ENGINES[storage]
+        self._storage_name = storage
+
+        self._policy = policy
+        self._max_load = policy.max_load
+        if policy.initial_size is not None:
+            capacity = max(capacity, policy.capacity_for(policy.initial_size))
+        self._capacity = self._next_capacity(capacity)
+        # shrinking never goes below the capacity the map started with
+        self._min_capacity = self._capacity
+        self._storage = self._storage_engine(self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0
+        self._compact_threshold = compact_threshold
+
+        # table being drained by an incremental resize, and the next bucket to move
+        self._incremental = incremental_resize
+        self._resize_batch = resize_batch
+        self._old_storage = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+        # bumped on every structural change, so iterators can detect them
+        self._version = 0
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
         """
+        self._finish_resize()
         out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for i in range(self._storage.length()):
+            out += str(i) + ': ' + str(self._storage.entry_at(i)) + '\n'
         return out
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        Return the closest valid capacity under the map's capacity policy
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        return self._next_prime(capacity)
+
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number to find the closest prime number
@@ -72,45 +362,494 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstones(self) -> int:
+        """
+        Return number of tombstones in the map
+        """
+        return self._tombstones
+
+    def get_storage(self) -> str:
+        """
+        Return name of the bucket storage engine
+        """
+        return self._storage_name
+
+    def get_capacity_policy(self) -> str:
+        """
+        Return name of the capacity policy
+        """
+        return 'power_of_two' if self._power_of_two else 'prime'
+
+    def get_probing(self) -> str:
+        """
+        Return name of the probing strategy
+        """
+        return self._probing.name
+
+    def get_load_policy(self) -> LoadPolicy:
+        """
+        Return the load policy, with the map's defaults filled in
+        """
+        return self._policy
+
+    def is_resizing(self) -> bool:
+        """
+        Return True while an incremental resize is still moving entries
+        """
+        return self._old_storage is not None
+
+    def occupancy(self) -> dict:
+        """
+        Return the size, capacity and load of the map and its tombstones and
+        empty buckets, from counters kept up to date by every change.
+        While an incremental resize runs the figures are those of the finished table.
+        """
+        if self._debug:
+            self.check_counters()
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'tombstones': self._tombstones,
+            'empty': self._capacity - self._size - self._tombstones,
+        }
+
+    def check_counters(self) -> None:
+        """
+        Scan the whole table and raise RuntimeError if the size or tombstone
+        counters disagree with it
+        """
+        self._finish_resize()
+        size = tombstones = 0
+        for index in range(self._storage.length()):
+            hash = self._storage.hash_at(index)
+            if hash >= 0:
+                size += 1
+            elif hash == TOMBSTONE:
+                tombstones += 1
+        if (size, tombstones) != (self._size, self._tombstones):
+            raise RuntimeError(f"counters out of sync: size {self._size}, tombstones {self._tombstones}; "
+                               f"table holds {size} keys and {tombstones} tombstones")
+
+    def stats(self) -> dict:
+        """
+        Return the occupancy of the map, plus for an instrumented map the operation
+        counts, mean and longest probes per operation, a histogram of probe counts
+        in power of two bins, and resize counts and durations
+        """
+        result = self.occupancy()
+        if self._stats is not None:
+            result.update(self._stats.summary())
+        return result
+
+    @property
+    def _buckets(self) -> DynamicArray:
+        """Buckets of the map as HashEntry objects (a copy for the array engine)"""
+        self._finish_resize()
+        return self._storage.get_buckets()
+
     # ------------------------------------------------------------------ #
 
-    def _get_hash_key (self, key: str, capacity: int) -> int:
-        """Helper function to calculate the hash key with quadratic probing."""
-        hash_key = self._hash_function(key)
-        hash_key %= capacity
-        hash_const = hash_key
-        q_probing = 1
+    def _hash(self, key: str) -> int:
+        """Helper function to compute the full hash of a key, masked to a non-negative 63 bit int."""
+        return self._hash_function(key) & HASH_MASK
 
-        while self._buckets[hash_key] is not None:
-            # return if key matches to replace value
-            if self._buckets[hash_key].key == key:
+    def _get_hash_key(self, key: str, capacity: int, hash: int = None, storage=None) -> int:
+        """
+        Helper function to calculate the hash key with the map's probing strategy.
+        Returns the index of the live entry holding key, otherwise the first
+        tombstone seen along the probe sequence, otherwise the empty bucket that ended it.
+        The key's full hash may be passed in to avoid calling the hash function again.
+        """
+        if hash is None:
+            hash = self._hash(key)
+        if storage is None:
+            storage = self._storage
+        hash_at = storage.hash_at
+        first_tombstone = None
+
+        for hash_key in self._probing.probe(self._home(hash, capacity), hash, capacity, key):
+            slot_hash = hash_at(hash_key)
+            if slot_hash == EMPTY:
+                break
+            if slot_hash == TOMBSTONE:
+                # remember the first reusable bucket but keep looking for the key
+                if first_tombstone is None:
+                    first_tombstone = hash_key
+            elif slot_hash == hash and storage.key_at(hash_key) == key:
+                # return if key matches to replace value; cached hashes are compared first
                 return hash_key
-            # update based on quadratic probing
-            hash_key = (hash_const + q_probing ** 2) % capacity
-            q_probing += 1
 
+        if first_tombstone is not None:
+            return first_tombstone
         return hash_key
 
-    def put(self, key: str, value: object) -> None:
+    def _robin_hood_find(self, key: str, hash: int) -> int:
+        """
+        Helper function returning the index of the live entry holding key, or -1.
+        The probe stops at the first entry that sits closer to its home bucket than key would.
+        """
+        storage, capacity, home = self._storage, self._capacity, self._home
+        hash_at = storage.hash_at
+        hash_key = home(hash, capacity)
+        found = -1
+
+        for distance in range(capacity):
+            slot_hash = hash_at(hash_key)
+            if slot_hash == EMPTY:
+                break
+            if slot_hash == hash and storage.key_at(hash_key) == key:
+                found = hash_key
+                break
+            if (hash_key - home(slot_hash, capacity)) % capacity < distance:
+                break
+            hash_key += 1
+            if hash_key == capacity:
+                hash_key = 0
+
+        if self._stats is not None:
+            self._stats.probes += distance + 1
+        return found
+
+    def _robin_hood_insert(self, storage, capacity: int, hash: int, key: str, value: object) -> None:
+        """
+        Helper function to insert a key known to be absent. Whenever the entry being placed
+        is further from home than the occupant of a bucket, the two swap places
+        and the displaced occupant continues down the probe sequence.
+        """
+        hash_at, home = storage.hash_at, self._home
+        hash_key = home(hash, capacity)
+        distance = 0
+
+        slot_hash = hash_at(hash_key)
+        while slot_hash != EMPTY:
+            slot_distance = (hash_key - home(slot_hash, capacity)) % capacity
+            if slot_distance < distance:
+                displaced = (slot_hash, storage.key_at(hash_key), storage.value_at(hash_key))
+                storage.store(hash_key, hash, key, value)
+                hash, key, value = displaced
+                distance = slot_distance
+            hash_key += 1
+            if hash_key == capacity:
+                hash_key = 0
+            distance += 1
+            slot_hash = hash_at(hash_key)
+
+        storage.store(hash_key, hash, key, value)
+
+    def _robin_hood_delete(self, hash_key: int) -> None:
+        """
+        Helper function to remove the entry at hash_key by shifting every following
+        entry that is away from its home bucket back by one, so no tombstone is needed.
+        """
+        storage, capacity = self._storage, self._capacity
+        storage.clear_at(hash_key)
+
+        next_key = (hash_key + 1) % capacity
+        slot_hash = storage.hash_at(next_key)
+        while slot_hash >= 0 and (next_key - self._home(slot_hash, capacity)) % capacity > 0:
+            # move leaves next_key empty, which becomes the gap to fill next
+            storage.move(next_key, hash_key)
+            hash_key = next_key
+            next_key = (next_key + 1) % capacity
+            slot_hash = storage.hash_at(next_key)
+
+    def _find(self, key: str, hash: int) -> int:
+        """Helper function returning the index of the live entry holding key, or -1."""
+        if self._probing.robin_hood:
+            return self._robin_hood_find(key, hash)
+
+        storage, capacity = self._storage, self._capacity
+        hash_at = storage.hash_at
+        for hash_key in self._probing.probe(self._home(hash, capacity), hash, capacity, key):
+            slot_hash = hash_at(hash_key)
+            if slot_hash == EMPTY:
+                return -1
+            # tombstones never match since their sentinel is negative
+            if slot_hash == hash and storage.key_at(hash_key) == key:
+                return hash_key
+        return -1
+
+    def _find_old(self, key: str, hash: int) -> int:
+        """
+        Helper function returning the index of key in the table being drained by
+        an incremental resize, or -1. Moved entries leave tombstones behind and nothing
+        is shifted there, so a plain probe up to the first empty bucket is used
+        (for Robin Hood tables too).
+        """
+        storage, capacity = self._old_storage, self._old_capacity
+        if storage is None:
+            return -1
+        hash_at = storage.hash_at
+        for hash_key in self._probing.probe(self._home(hash, capacity), hash, capacity, key):
+            slot_hash = hash_at(hash_key)
+            if slot_hash == EMPTY:
+                return -1
+            if slot_hash == hash and storage.key_at(hash_key) == key:
+                return hash_key
+        return -1
+
+    def _locate(self, key: str, hash: int, operation: str = 'get') -> tuple:
+        """
+        Helper function returning (storage, index) of the live entry holding key,
+        looking in the table being drained by an incremental resize as well.
+        The index is -1 if the key is absent. Instrumented maps record the
+        probes under operation.
+        """
+        stats = self._stats
+        if stats is not None:
+            start = stats.probes
+
+        storage, hash_key = self._storage, self._find(key, hash)
+        if hash_key < 0 and self._old_storage is not None:
+            storage, hash_key = self._old_storage, self._find_old(key, hash)
+
+        if stats is not None:
+            stats.record(operation, stats.probes - start, key)
+        return storage, hash_key
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Helper function to swap in new_capacity empty buckets, keeping the current ones
+        as the old table whose entries are moved over by _migrate.
+        """
+        self._finish_resize()
+        start = time.perf_counter()
+        self._old_storage, self._old_capacity = self._storage, self._capacity
+        self._migrate_index = 0
+        self._storage = self._storage_engine(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._version += 1
+
+        if self._stats is not None:
+            self._stats.record_resize('resize', self._old_capacity, new_capacity, self._size,
+                                      time.perf_counter() - start)
+
+    def _migrate(self, count: int) -> None:
         """
-        Adds the key:value pair to the hash map. Resizes if needed.
+        Helper function to move the live entries of the next count buckets of the old
+        table into the current one, leaving tombstones behind. Drops the old table
+        once its last bucket has been moved.
+        """
+        old_storage = self._old_storage
+        start = self._migrate_index
+        end = min(start + count, self._old_capacity)
+        # probes spent moving entries are not charged to the operation that moved them
+        stats = self._stats
+        if stats is not None:
+            probes = stats.probes
+
+        for index in range(start, end):
+            hash = old_storage.hash_at(index)
+            if hash < 0:
+                continue
+            self._place(hash, old_storage.key_at(index), old_storage.value_at(index))
+            # drop the old entry now rather than all at once with the old table
+            old_storage.discard(index)
+
+        if stats is not None:
+            stats.probes = probes
+
+        if end == self._old_capacity:
+            self._old_storage = None
+        else:
+            self._migrate_index = end
+
+    def _finish_resize(self) -> None:
+        """Helper function to move every remaining entry of an incremental resize at once."""
+        if self._old_storage is not None:
+            self._migrate(self._old_capacity)
+
+    def _place(self, hash: int, key: str, value: object) -> None:
+        """Helper function to store a key known to be absent from the current table."""
+        if self._probing.robin_hood:
+            self._robin_hood_insert(self._storage, self._capacity, hash, key, value)
+            return
+
+        hash_key = self._get_hash_key(key, self._capacity, hash)
+        while self._storage.hash_at(hash_key) >= 0:
+            # the probe sequence ran out of buckets to try: grow the current table,
+            # leaving the old one of an incremental resize to be drained as before
+            self._install(self._rebuilt(self._next_capacity(self._policy.grown(self._capacity))))
+            hash_key = self._get_hash_key(key, self._capacity, hash)
+        recycled = self._storage.hash_at(hash_key) == TOMBSTONE
+        self._storage.store(hash_key, hash, key, value)
+        if recycled:
+            self._tombstones -= 1
+
+    def _find_for_update(self, key: str, hash: int = None) -> tuple:
+        """
+        Helper function for the operations that may add key: resizes or compacts if needed,
+        hashes key once (unless its full hash is passed in) and probes for it.
+        Returns (storage, index, hash, found).
+        When found, index is the live entry holding key, possibly in the old table of an
+        incremental resize. Otherwise index is the bucket _store_new should use,
+        or -1 if the probe sequence ran out of buckets (always -1 for Robin Hood).
         """
         # check if resize is needed
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        if self.table_load() >= self._max_load:
+            if self._incremental:
+                self._start_resize(self._next_capacity(self._policy.grown(self._capacity)))
+            else:
+                self.resize_table(self._policy.grown(self._capacity))
+        # tombstones count towards probe lengths, so clear them out once they pile up
+        elif (self._size + self._tombstones) / self._capacity >= self._compact_threshold:
+            self.compact()
+
+        stats = self._stats
+        if stats is None:
+            return self._probe_for_update(key, hash)
+        start = stats.probes
+        result = self._probe_for_update(key, hash)
+        stats.record('put', stats.probes - start, key)
+        return result
+
+    def _probe_for_update(self, key: str, hash: int = None) -> tuple:
+        """
+        Helper function for _find_for_update doing the hashing and probing,
+        once any resize has been dealt with
+        """
+        if hash is None:
+            hash = self._hash(key)
+        if self._old_storage is not None:
+            self._migrate(self._resize_batch)
+            # keys that have not been moved yet are updated in the old table
+            hash_key = self._find_old(key, hash)
+            if hash_key >= 0:
+                return self._old_storage, hash_key, hash, True
+
+        if self._probing.robin_hood:
+            hash_key = self._robin_hood_find(key, hash)
+            return self._storage, hash_key, hash, hash_key >= 0
+
+        hash_key = self._get_hash_key(key, self._capacity, hash)
+        slot_hash = self._storage.hash_at(hash_key)
+
+        # key already exists
+        if slot_hash == hash and self._storage.key_at(hash_key) == key:
+            return self._storage, hash_key, hash, True
+
+        # a live entry here means the probe sequence ran out of buckets to try
+        return self._storage, hash_key if slot_hash < 0 else -1, hash, False
+
+    def _store_new(self, hash: int, key: str, value: object, hash_key: int) -> None:
+        """
+        Helper function to add a key that _find_for_update did not find,
+        at the bucket it returned.
+        """
+        if self._probing.robin_hood:
+            self._robin_hood_insert(self._storage, self._capacity, hash, key, value)
+        elif hash_key < 0:
+            # the probe sequence ran out of buckets to try, so make room first
+            self.resize_table(self._policy.grown(self._capacity))
+            self._place(hash, key, value)
+        else:
+            # recycle the tombstone if the probe stopped on one; the counter is only
+            # changed once store has accepted the key, which IntHashMap may reject
+            recycled = self._storage.hash_at(hash_key) == TOMBSTONE
+            self._storage.store(hash_key, hash, key, value)
+            if recycled:
+                self._tombstones -= 1
 
-        new_obj = HashEntry(key, value)
-        hash_key = self._get_hash_key(key, self._capacity)
-        index = self._buckets[hash_key]
+        self._size += 1
+        self._version += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds the key:value pair to the hash map. Resizes or compacts if needed.
+        """
+        storage, hash_key, hash, found = self._find_for_update(key)
 
         # replace value if key already exists
-        if index is not None and index.is_tombstone is False:
-            if index.key == key:
-                index.value = value
-                return
+        if found:
+            storage.set_value(hash_key, value)
+        else:
+            self._store_new(hash, key, value, hash_key)
 
-        self._buckets[hash_key] = new_obj
-        self._size += 1
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value of key. If key is not in the hash map, adds it with
+        the default value first.
+        """
+        storage, hash_key, hash, found = self._find_for_update(key)
+        if found:
+            return storage.value_at(hash_key)
+        self._store_new(hash, key, default, hash_key)
+        return default
+
+    def upsert(self, key: str, function: callable, default: object = None) -> object:
+        """
+        Replaces the value of key with function(value), adding key with function(default)
+        if it is not in the hash map. Returns the new value.
+        function must not modify the hash map.
+        """
+        storage, hash_key, hash, found = self._find_for_update(key)
+        if found:
+            value = function(storage.value_at(hash_key))
+            storage.set_value(hash_key, value)
+        else:
+            value = function(default)
+            self._store_new(hash, key, value, hash_key)
+        return value
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value of key, starting from 0 if key is not in the hash map.
+        The key is hashed and probed for once. Returns the new value.
+        """
+        storage, hash_key, hash, found = self._find_for_update(key)
+        if found:
+            value = storage.value_at(hash_key) + delta
+            storage.set_value(hash_key, value)
+            return value
+        self._store_new(hash, key, delta, hash_key)
+        return delta
+
+    def put_many(self, pairs, expected_size: int = None) -> None:
+        """
+        Adds every key:value pair from an iterable of pairs. The table is sized once,
+        up front, for expected_size new keys (the number of pairs by default),
+        so no resizes happen while the pairs are inserted. Keys are hashed a batch
+        at a time when the hash function has a vectorized version in bulk_hash.
+        """
+        pairs, expected_size = sized_pairs(pairs, expected_size)
+
+        needed = self._size + expected_size
+        if needed > 0:
+            # smallest capacity that keeps the load under max_load until the last put
+            capacity = max(self._next_capacity(self._policy.capacity_for(needed)), self._capacity)
+            if capacity > self._capacity or \
+                    needed + self._tombstones >= self._compact_threshold * self._capacity:
+                self._rehash(capacity)
+
+        if not vectorized(self._hash_function):
+            put = self.put
+            for key, value in pairs:
+                put(key, value)
+            return
+
+        find, store_new = self._find_for_update, self._store_new
+        for batch in batched(pairs, LOAD_BATCH):
+            hashes = hash_many(self._hash_function, [key for key, _ in batch])
+            for (key, value), hash in zip(batch, hashes):
+                # the same steps as put, with the hash already computed
+                storage, hash_key, hash, found = find(key, hash & HASH_MASK)
+                if found:
+                    storage.set_value(hash_key, value)
+                else:
+                    store_new(hash, key, value, hash_key)
+
+    @classmethod
+    def from_pairs(cls, pairs, function, expected_size: int = None, **kwargs) -> "HashMap":
+        """
+        Build a new HashMap from an iterable of key:value pairs in a single pass.
+        Other keyword arguments are passed on to the constructor.
+        """
+        pairs, expected_size = sized_pairs(pairs, expected_size)
+        hash_map = cls(1, function, **kwargs)
+        hash_map.put_many(pairs, expected_size)
+        return hash_map
 
     def table_load(self) -> float:
         """
@@ -122,12 +861,10 @@ class HashMap:
         """
         Returns the amount of empty buckets in the hash table
         """
-        empty_buckets = 0
-        for index in range(self._buckets.length()):
-            if self._buckets[index] is None or self._buckets[index].is_tombstone is True:
-                empty_buckets += 1
-
-        return empty_buckets
+        if self._debug:
+            self.check_counters()
+        # tombstones count as empty; an incremental resize in progress does not change the result
+        return self._capacity - self._size
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -135,113 +872,520 @@ class HashMap:
         """
         if self._size > new_capacity:
             return
+        self._rehash(self._valid_capacity(new_capacity))
 
-        # new hash map with new capacity
-        updated_map = HashMap(new_capacity, self._hash_function)
+    def _valid_capacity(self, new_capacity: int) -> int:
+        """
+        Helper function returning the capacity a resize to new_capacity ends up with
+        """
+        # capacity keeps doubling until the rehashed entries fit under the load limit
+        new_capacity = self._next_capacity(new_capacity)
+        while self._size - 1 >= new_capacity * self._max_load:
+            new_capacity = self._next_capacity(self._policy.grown(new_capacity))
+        return new_capacity
 
-        # iterate over the buckets of temp map and insert into the actual map
-        for index in range(self._capacity):
-            hash_obj = self._buckets[index]
-            if hash_obj is not None and hash_obj.is_tombstone is False:
-                updated_map.put(hash_obj.key, hash_obj.value)
+    def compact(self) -> None:
+        """
+        Rehashes all live entries at the current capacity, dropping tombstones.
+        """
+        self._finish_resize()
+        self._rehash(self._capacity)
 
-        self._buckets = updated_map.get_buckets()
-        self._capacity = updated_map.get_capacity()
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Helper function to move the live entries into new_capacity empty buckets.
+        Entries keep their cached hash, so the hash function is not called again.
+        """
+        self._finish_resize()
+        start = time.perf_counter()
+        stats = self._stats
+        if stats is not None:
+            probes = stats.probes
+
+        old_capacity = self._capacity
+        self._install(self._rebuilt(new_capacity))
+
+        if stats is not None:
+            # rehashing probes are not charged to the operation that triggered it
+            stats.probes = probes
+            stats.record_resize('compact' if self._capacity == old_capacity else 'resize',
+                                old_capacity, self._capacity, self._size, time.perf_counter() - start)
+
+    def _rebuilt(self, new_capacity: int) -> tuple:
+        """
+        Helper function returning a table of new_capacity buckets holding the live entries,
+        for _install; more buckets if a probe sequence runs out of buckets to try.
+        The current table is only read, so this may run in another thread while
+        the map is read but not changed.
+        """
+        old_storage, capacity = self._storage, self._capacity
+        while True:
+            new_storage = self._storage_engine(new_capacity)
+
+            # move the live entries over in bucket order, skipping tombstones
+            for index in range(capacity):
+                hash = old_storage.hash_at(index)
+                if hash < 0:
+                    continue
+                key, value = old_storage.key_at(index), old_storage.value_at(index)
+                if self._probing.robin_hood:
+                    self._robin_hood_insert(new_storage, new_capacity, hash, key, value)
+                    continue
+                hash_key = self._get_hash_key(key, new_capacity, hash, new_storage)
+                if new_storage.hash_at(hash_key) >= 0:
+                    # the probe sequence ran out of buckets to try, start over in a larger table
+                    break
+                new_storage.store(hash_key, hash, key, value)
+            else:
+                return new_storage, new_capacity
+
+            new_capacity = self._next_capacity(self._policy.grown(new_capacity))
+
+    def _install(self, table: tuple) -> None:
+        """Helper function to swap in a table built by _rebuilt from the current entries."""
+        self._storage, self._capacity = table
+        self._tombstones = 0
+        self._version += 1
 
     def get(self, key: str) -> object:
         """
         Checks if key is in hash map. If so, returns the value associated with the key
         """
-        hash_key = self._get_hash_key(key, self._capacity)
-        index = self._buckets[hash_key]
-
-        if index is None or index.is_tombstone is True:
-            return None
-        elif index.key == key and index.is_tombstone is False:
-            return index.value
-        else:
+        if self._old_storage is not None:
+            self._migrate(self._resize_batch)
+        storage, hash_key = self._locate(key, self._hash(key))
+        if hash_key < 0:
             return None
+        return storage.value_at(hash_key)
 
     def contains_key(self, key: str) -> bool:
         """
         Checks if hash map contains the key, if so returns True.
         """
-        hash_key = self._get_hash_key(key, self._capacity)
-        index = self._buckets[hash_key]
+        if self._old_storage is not None:
+            self._migrate(self._resize_batch)
+        return self._locate(key, self._hash(key))[1] >= 0
 
-        if index is None or index.is_tombstone is True:
-            return False
-        elif index.key == key and index.is_tombstone is False:
-            return True
-        else:
-            return False
+    def _find_many(self, keys: list) -> list:
+        """
+        Helper function returning the bucket index of every key in keys, or -1 if absent.
+        The whole batch is hashed and assigned home buckets first (vectorized where
+        bulk_hash can), then every probe runs with locally bound lookups.
+        """
+        hashes = [hash & HASH_MASK for hash in hash_many(self._hash_function, keys)]
+
+        if self._stats is not None:
+            # instrumented maps look every key up through _locate so each one is recorded
+            locate = self._locate
+            return [locate(key, hash)[1] for key, hash in zip(keys, hashes)]
+
+        if self._probing.robin_hood:
+            find = self._robin_hood_find
+            return [find(key, hash) for key, hash in zip(keys, hashes)]
+
+        capacity, probe = self._capacity, self._probing.probe
+        homes = bucket_indices(hashes, capacity, self._power_of_two)
+        hash_at, key_at = self._storage.hash_at, self._storage.key_at
+        result = []
+        append = result.append
+        for key, hash, start in zip(keys, hashes, homes):
+            # every probe sequence starts at home, where most keys are found,
+            # so the probe generator is only created past it
+            slot_hash = hash_at(start)
+            if slot_hash == hash and key_at(start) == key:
+                append(start)
+                continue
+            found = -1
+            if slot_hash != EMPTY:
+                for hash_key in probe(start, hash, capacity, key):
+                    slot_hash = hash_at(hash_key)
+                    if slot_hash == EMPTY:
+                        break
+                    # tombstones never match since their sentinel is negative
+                    if slot_hash == hash and key_at(hash_key) == key:
+                        found = hash_key
+                        break
+            append(found)
+        return result
+
+    def _locate_many(self, keys: list) -> list:
+        """
+        Helper function returning (storage, index) for every key in keys while an
+        incremental resize is in progress. Moves as many buckets as the same number
+        of get calls would.
+        """
+        self._migrate(self._resize_batch * len(keys))
+        locate, hashes = self._locate, hash_many(self._hash_function, keys)
+        return [locate(key, hash & HASH_MASK) for key, hash in zip(keys, hashes)]
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Returns an array with the value of every key in keys, in order,
+        using default for keys that are not in the hash map
+        """
+        keys = as_list(keys)
+        if self._old_storage is not None:
+            return DynamicArray([storage.value_at(hash_key) if hash_key >= 0 else default
+                                 for storage, hash_key in self._locate_many(keys)])
+
+        value_at = self._storage.value_at
+        return DynamicArray([value_at(hash_key) if hash_key >= 0 else default
+                             for hash_key in self._find_many(keys)])
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns an array telling, in order, whether each key in keys is in the hash map
+        """
+        keys = as_list(keys)
+        if self._old_storage is not None:
+            return DynamicArray([hash_key >= 0 for _, hash_key in self._locate_many(keys)])
+        return DynamicArray([hash_key >= 0 for hash_key in self._find_many(keys)])
 
     def remove(self, key: str) -> None:
         """
         Removes the key from the hash map if it exists.
         """
+        if self._old_storage is not None:
+            self._migrate(self._resize_batch)
         # find index the key would be at
-        hash_key = self._get_hash_key(key, self._capacity)
-        index = self._buckets[hash_key]
+        storage, hash_key = self._locate(key, self._hash(key), 'remove')
 
-        if index is not None and index.is_tombstone is False:
+        if hash_key >= 0 and storage is not self._storage:
+            # not moved yet by the incremental resize; nothing gets shifted in the old table
+            storage.delete(hash_key)
+            self._size -= 1
+            self._version += 1
+        elif hash_key >= 0 and self._probing.robin_hood:
+            self._robin_hood_delete(hash_key)
+            self._size -= 1
+            self._version += 1
+        elif hash_key >= 0:
             # replace with TS
-            index.is_tombstone = True
+            self._storage.delete(hash_key)
             self._size -= 1
+            self._version += 1
+            self._tombstones += 1
 
-        return
+        if hash_key >= 0 and self._policy.shrink:
+            self._shrink_if_needed()
+
+    def _shrink_if_needed(self) -> None:
+        """
+        Helper function to shrink the table once the load drops under the policy's
+        min_load, down to no less than the capacity the map started with
+        """
+        if self.table_load() >= self._policy.min_load or self._capacity <= self._min_capacity:
+            return
+        new_capacity = max(self._policy.shrunk(self._capacity), self._min_capacity)
+        if self._incremental:
+            self._start_resize(self._next_capacity(new_capacity))
+        else:
+            self.resize_table(new_capacity)
 
     def clear(self) -> None:
         """
         Clears contents of the hash map. Capacity is not changed.
         """
-        empty_buckets = DynamicArray()
-
-        for index in range(self._capacity):
-            empty_buckets.append(None)
-
-        self._buckets = empty_buckets
+        self._storage = self._storage_engine(self._capacity)
+        self._old_storage = None
         self._size = 0
+        self._tombstones = 0
+        self._version += 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns an array that list all key:value pairs stored in the has map as tuples.
         Array is unordered
         """
-        result = DynamicArray()
-
-        for num in range(self._capacity):
-            index = self._buckets[num]
-            if index is not None and index.is_tombstone is False:
-                result.append((index.key, index.value))
+        self._finish_resize()
+        return DynamicArray(self._items_in(0, self._capacity))
 
-        return result
+    def _items_in(self, start: int, end: int) -> list:
+        """Helper function returning the (key, value) pairs of the live entries in buckets start to end - 1"""
+        storage = self._storage
+        hash_at, key_at, value_at = storage.hash_at, storage.key_at, storage.value_at
+        return [(key_at(index), value_at(index)) for index in range(start, end) if hash_at(index) >= 0]
 
     def get_buckets(self) -> DynamicArray:
         """Returns buckets for hash map"""
-        return self._buckets
+        self._finish_resize()
+        return self._storage.get_buckets()
+
+    def _iterator(self, kind: str) -> "HashMapIterator":
+        """Helper function returning a new iterator of the given kind, used by the views"""
+        return HashMapIterator(self, kind)
 
-    def __iter__(self):
+    def __iter__(self) -> "HashMapIterator":
         """
-        Create iterator for loop
+        Create iterator over the entries of the map
         """
-        self._index = 0
-        return self
+        return HashMapIterator(self)
+
+    def keys(self) -> KeysView:
+        """Returns a lazy view of the keys in the hash map"""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """Returns a lazy view of the values in the hash map"""
+        return ValuesView(self)
 
-    def __next__(self):
+    def items(self) -> ItemsView:
+        """Returns a lazy view of the key:value pairs in the hash map"""
+        return ItemsView(self)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the hash map to a binary snapshot file at path, bucket layout included,
+        so load restores it without hashing or probing a single key.
+        The hash function is not saved; the map must be loaded with one giving the same hashes.
+        """
+        probing = self._probing
+        if isinstance(probing, CountingProbing):
+            probing = probing.probing
+        if type(probing) is not PROBING_STRATEGIES[probing.name] or getattr(probing, '_function', None):
+            raise ValueError("only built-in probing strategies without a second hash function can be saved")
+
+        self._finish_resize()
+        write_snapshot(path, self._storage, {
+            'size': self._size,
+            'tombstones': self._tombstones,
+            'probing': probing.name,
+            'capacity_policy': self.get_capacity_policy(),
+            'compact_threshold': self._compact_threshold,
+            'load_policy': self._policy.to_dict(),
+            'hash_check_key': self._check_key,
+            'hash_check': self._hash(self._check_key),
+        })
+
+    @classmethod
+    def load(cls, path: str, function, storage: str = 'entry', mapped: bool = False) -> "HashMap":
         """
-        Obtain the next value and advance interator
+        Reads a snapshot written by save; function must be the hash function it was saved with.
+        The buckets are copied into a new map using the given storage engine.
+        With mapped, a read-only MappedHashMap answering lookups straight from the
+        memory mapped file is returned instead.
+        Keys and values other than str and bytes are stored pickled, and unpickling
+        can run arbitrary code: never load a snapshot from an untrusted source.
         """
+        if mapped:
+            return MappedHashMap(path, function)
+
+        header, snapshot = read_snapshot(path)
         try:
-            value = self._buckets[self._index]
-            while value is None or value.is_tombstone:
-                self._index += 1
-                value = self._buckets[self._index]
-        except DynamicArrayException:
-            raise StopIteration
+            hash_map = cls(header['capacity'], function, header['compact_threshold'], storage,
+                           header['probing'], header['capacity_policy'],
+                           load_policy=LoadPolicy(**dict(header.get('load_policy', {}), initial_size=None)))
+            hash_map._check_snapshot(header)
+
+            # copy the layout bucket for bucket; tombstones have to stay to keep probe sequences intact
+            target = hash_map._storage
+            for index in range(header['capacity']):
+                hash = snapshot.hash_at(index)
+                if hash >= 0:
+                    target.store(index, hash, snapshot.key_at(index), snapshot.value_at(index))
+                elif hash == TOMBSTONE:
+                    target.discard(index)
+        finally:
+            snapshot.close()
+
+        hash_map._size = header['size']
+        hash_map._tombstones = header['tombstones']
+        return hash_map
+
+    def _check_snapshot(self, header: dict) -> None:
+        """Helper function to check the map matches the layout of a snapshot it is loaded from."""
+        if self._capacity != header['capacity']:
+            raise ValueError(f"snapshot capacity {header['capacity']} is not valid for its capacity policy")
+        try:
+            hash_check = self._hash(header.get('hash_check_key', SNAPSHOT_CHECK_KEY))
+        except TypeError:
+            # the hash function does not even take the kind of keys the snapshot holds
+            hash_check = None
+        if hash_check != header['hash_check']:
+            raise ValueError("hash function does not match the one the snapshot was saved with")
+
+
+class MappedHashMap(HashMap):
+    """
+    Read-only HashMap over a memory mapped snapshot file written by HashMap.save.
+    get, contains_key, the batch lookups and iteration read the buckets straight
+    from the file, so opening it costs the same whatever its size and only the
+    pages actually probed are loaded. Methods that would change the map raise TypeError.
+    Call close, or use the map as a context manager, to unmap the file.
+    Keys and values are unpickled as they are read, as for HashMap.load, so only
+    open snapshots from a trusted source.
+    """
+
+    def __init__(self, path: str, function) -> None:
+        """Open the snapshot at path; function must be the hash function it was saved with."""
+        header, storage = read_snapshot(path, mapped=True)
+        try:
+            # start from the smallest table, the mapped buckets replace it below
+            super().__init__(1, function, header['compact_threshold'], 'array',
+                             header['probing'], header['capacity_policy'])
+            self._capacity = self._next_capacity(header['capacity'])
+            self._check_snapshot(header)
+        except BaseException:
+            storage.close()
+            raise
+
+        self._storage = storage
+        self._storage_name = 'mapped'
+        self._size = header['size']
+        self._tombstones = header['tombstones']
+
+    def _read_only(self, *args, **kwargs) -> None:
+        """Methods that would change the map raise TypeError"""
+        raise TypeError("a MappedHashMap is read-only")
+
+    put = put_many = setdefault = upsert = increment = remove = clear = _read_only
+    resize_table = compact = _read_only
+    # the table helpers an AsyncHashMap drives directly
+    _start_resize = _install = _read_only
+
+    def close(self) -> None:
+        """
+        Unmap the snapshot file. The map cannot be used afterwards.
+        """
+        self._storage.close()
 
-        self._index += 1
-        return value
+    def __enter__(self) -> "MappedHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmap the snapshot file at the end of a with statement."""
+        self.close()
+
+
+class IntHashMap(HashMap):
+    """
+    HashMap specialized for int keys, such as numeric IDs, that would otherwise
+    have to be converted with str first. Hashes and keys are kept in array('q')
+    columns (IntArrayStorage), so the only Python objects in the table are the
+    values, and keys are hashed with the multiplicative int_hash.
+    Keys must be ints that fit in a signed 64 bit integer; anything else raises
+    TypeError or OverflowError. Supported methods are those of HashMap.
+    """
+
+    # the bytes of SNAPSHOT_CHECK_KEY read as an int
+    _check_key = 0x736E617073686F74
+
+    def __init__(self, capacity: int = 11, function=int_hash, compact_threshold: float = 0.75,
+                 storage: str = 'int', probing=None,
+                 capacity_policy: str = 'prime', incremental_resize: bool = False,
+                 resize_batch: int = 8, instrument=False, debug: bool = False,
+                 load_policy: LoadPolicy = None) -> None:
+        """
+        Initialize new IntHashMap; the arguments are those of HashMap,
+        except that storage can only be 'int'.
+        """
+        if storage != 'int':
+            raise ValueError("IntHashMap only supports the 'int' storage engine")
+        super().__init__(capacity, function, compact_threshold, 'array', probing, capacity_policy,
+                         incremental_resize, resize_batch, instrument, debug, load_policy)
+        self._storage_engine = IntArrayStorage
+        self._storage_name = 'int'
+        self._storage = IntArrayStorage(self._capacity)
+        # (a, b) of the probing strategy if probes are inlined, None to use its generator
+        self._steps = INLINED_PROBE_STEPS.get(type(self._probing))
+
+    def _find(self, key: int, hash: int) -> int:
+        """Helper function returning the index of the live entry holding key, or -1."""
+        if self._steps is None:
+            return super()._find(key, hash)
+
+        capacity = self._capacity
+        hashes, keys, _ = self._storage.columns()
+        a, b = self._steps
+        hash_key = self._home(hash, capacity)
+        step = 0
+        while step < capacity:
+            slot_hash = hashes[hash_key]
+            if slot_hash == EMPTY:
+                return -1
+            if slot_hash == hash and keys[hash_key] == key:
+                return hash_key
+            step += 1
+            hash_key = (hash_key + a * step + b) % capacity
+        return -1
+
+    def get(self, key: int) -> object:
+        """
+        Checks if key is in hash map. If so, returns the value associated with the key
+        """
+        if self._old_storage is not None or self._stats is not None:
+            return super().get(key)
+        hash_key = self._find(key, self._hash_function(key) & HASH_MASK)
+        return self._storage.value_at(hash_key) if hash_key >= 0 else None
+
+    def contains_key(self, key: int) -> bool:
+        """
+        Checks if hash map contains the key, if so returns True.
+        """
+        if self._old_storage is not None or self._stats is not None:
+            return super().contains_key(key)
+        return self._find(key, self._hash_function(key) & HASH_MASK) >= 0
+
+    def _get_hash_key(self, key: int, capacity: int, hash: int = None, storage=None) -> int:
+        """
+        Helper function to calculate the hash key with the map's probing strategy,
+        as HashMap._get_hash_key does
+        """
+        if self._steps is None:
+            return super()._get_hash_key(key, capacity, hash, storage)
+        if hash is None:
+            hash = self._hash(key)
+        if storage is None:
+            storage = self._storage
+
+        hashes, keys, _ = storage.columns()
+        a, b = self._steps
+        hash_key = self._home(hash, capacity)
+        first_tombstone = None
+        step = 1
+        while True:
+            slot_hash = hashes[hash_key]
+            if slot_hash == EMPTY:
+                break
+            if slot_hash == TOMBSTONE:
+                if first_tombstone is None:
+                    first_tombstone = hash_key
+            elif slot_hash == hash and keys[hash_key] == key:
+                return hash_key
+            # the last index of the probe sequence is the one returned when it runs out
+            if step == capacity:
+                break
+            hash_key = (hash_key + a * step + b) % capacity
+            step += 1
+
+        if first_tombstone is not None:
+            return first_tombstone
+        return hash_key
+
+    def _find_many(self, keys: list) -> list:
+        """Helper function returning the bucket index of every key in keys, or -1 if absent."""
+        if self._steps is None or self._stats is not None:
+            return super()._find_many(keys)
+        find, hash = self._find, self._hash
+        return [find(key, hash(key)) for key in keys]
+
+    @classmethod
+    def from_pairs(cls, pairs, function=int_hash, expected_size: int = None, **kwargs) -> "IntHashMap":
+        """
+        Build a new IntHashMap from an iterable of key:value pairs in a single pass.
+        Other keyword arguments are passed on to the constructor.
+        """
+        return super().from_pairs(pairs, function, expected_size, **kwargs)
+
+    @classmethod
+    def load(cls, path: str, function=int_hash, storage: str = 'int', mapped: bool = False) -> HashMap:
+        """
+        Reads a snapshot written by save; function must be the hash function it was saved with.
+        With mapped, a read-only MappedHashMap is returned, as for HashMap.load.
+        Only load snapshots from a trusted source, see HashMap.load.
+        """
+        return super().load(path, function, storage, mapped)
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -482,3 +1626,18 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nIntHashMap - key out of range")
+    print("-----------------------------")
+    m = IntHashMap(11)
+    for i in range(8):
+        m.put(i, i)
+    for i in range(8):
+        m.remove(i)
+    try:
+        # every probe now stops on a tombstone; a rejected key must not use it up
+        m.put(2 ** 70, 'too big')
+    except OverflowError:
+        print('OverflowError')
+    m.check_counters()
+    print(m.get_size(), m.get_tombstones())
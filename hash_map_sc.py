@@ -1,23 +1,142 @@
 # Description: A hash map utilizing a dynamic array which uses singly linked lists for collisions.
 
-from DS_include import (DynamicArray, LinkedList,
+import time
+
+from DS_include import (DynamicArray, LinkedList, KeysView, ValuesView, ItemsView, CAPACITY_POLICIES,
+                        next_power_of_two, modulo_index, fibonacci_index, sized_pairs, as_list,
                         hash_function_1, hash_function_2)
+from map_stats import MapStats
+from load_policy import LoadPolicy
+from bulk_hash import LOAD_BATCH, batched, vectorized, hash_many, bucket_indices
+
+
+class HashMapIterator:
+    """
+    Iterator over the nodes of a HashMap, independent of any other iterator.
+    kind selects what is yielded: 'entries' (SLNode objects), 'keys', 'values'
+    or 'items' ((key, value) tuples).
+    Raises RuntimeError if the map is changed structurally while iterating.
+    """
+
+    __slots__ = ('_map', '_buckets', '_index', '_node', '_kind', '_version')
+
+    def __init__(self, hash_map: "HashMap", kind: str = 'entries') -> None:
+        """Initialize the iterator before the first bucket of hash_map."""
+        if kind not in ('entries', 'keys', 'values', 'items'):
+            raise ValueError(f"unknown iterator kind {kind!r}")
+        hash_map._finish_resize()
+        self._map = hash_map
+        self._buckets = hash_map._bucket_list
+        self._index = 0
+        self._node = None
+        self._kind = kind
+        self._version = hash_map._version
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> object:
+        """Obtain the next node's entry and advance the iterator."""
+        if self._map._version != self._version:
+            raise RuntimeError("hash map changed during iteration")
+
+        node = self._node
+        if node is None:
+            # move on to the next non-empty bucket
+            buckets, index = self._buckets, self._index
+            while node is None and index < len(buckets):
+                bucket = buckets[index]
+                index += 1
+                if bucket is not None:
+                    node = bucket.head()
+            self._index = index
+            if node is None:
+                raise StopIteration
+        self._node = node.next
+
+        kind = self._kind
+        if kind == 'keys':
+            return node.key
+        if kind == 'values':
+            return node.value
+        if kind == 'items':
+            return node.key, node.value
+        return node
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 capacity_policy: str = 'prime',
+                 lazy_buckets: bool = False,
+                 incremental_resize: bool = False,
+                 resize_batch: int = 8,
+                 instrument=False,
+                 debug: bool = False,
+                 load_policy: LoadPolicy = None) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
+        separate chaining for collision resolution.
+        capacity_policy is 'prime' (hash % capacity indexing) or 'power_of_two'
+        (Fibonacci scrambled hash & (capacity - 1) indexing).
+        With lazy_buckets, empty buckets are None and a LinkedList is only
+        allocated once a key lands in the bucket.
+        With incremental_resize a growing put only swaps in the larger table;
+        the chains of the old one are moved over resize_batch buckets at a time
+        by the following put, get and remove calls. Incremental resizing implies
+        lazy_buckets, so swapping in the larger table is a single allocation.
+        With instrument (True, or a MapStats to use) the chain length seen by each
+        operation and the resizes are recorded and reported by stats().
+        With debug, empty_buckets and occupancy check the counters they read
+        against a full scan of the table.
+        load_policy sets the load factor the table grows at (1.0 by default),
+        the growth factor, shrinking after removes and the number of keys to size
+        the table for up front.
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(f"unknown capacity policy {capacity_policy!r}")
+        if resize_batch < 1:
+            raise ValueError("resize_batch must be at least 1")
+        self._power_of_two = capacity_policy == 'power_of_two'
+        self._home = fibonacci_index if self._power_of_two else modulo_index
+        self._lazy_buckets = lazy_buckets or incremental_resize
+
+        # buckets being drained by an incremental resize, and the next one to move
+        self._incremental = incremental_resize
+        self._resize_batch = resize_batch
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+        # bumped on every structural change, so iterators can detect them
+        self._version = 0
+
+        # statistics of an instrumented map, None otherwise
+        if instrument and not isinstance(instrument, MapStats):
+            instrument = MapStats()
+        self._stats = instrument or None
+        self._debug = debug
+
+        # non-empty buckets, counted over both tables while an incremental resize runs,
+        # and how many of them are in the old table
+        self._occupied = 0
+        self._old_occupied = 0
+
+        self._policy = (load_policy or LoadPolicy()).resolve(1.0)
+        self._max_load = self._policy.max_load
+        if self._policy.initial_size is not None:
+            capacity = max(capacity, self._policy.capacity_for(self._policy.initial_size))
+
+        # capacity must be a prime number, or a power of two under that policy
+        if self._power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
+        self._set_buckets(self._new_buckets(self._capacity))
+        # shrinking never goes below the capacity the map started with
+        self._min_capacity = self._capacity
 
         self._hash_function = function
         self._size = 0
@@ -26,9 +145,11 @@ class HashMap:
         """
         Override string method to provide more readable output
         """
+        self._finish_resize()
         out = ''
         for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+            bucket = self._buckets[i]
+            out += str(i) + ': ' + (str(bucket) if bucket is not None else 'SLL []') + '\n'
         return out
 
     def _next_prime(self, capacity: int) -> int:
@@ -74,44 +195,314 @@ class HashMap:
         """
         return self._capacity
 
+    def _new_buckets(self, capacity: int) -> DynamicArray:
+        """
+        Return capacity empty buckets
+        """
+        if self._lazy_buckets:
+            return DynamicArray.filled(capacity)
+        return DynamicArray([LinkedList() for _ in range(capacity)])
+
+    def _set_buckets(self, buckets: DynamicArray) -> None:
+        """
+        Install a new bucket array, keeping an unchecked view of it for the hot paths
+        """
+        self._buckets = buckets
+        self._bucket_list = buckets.raw()
+
+    def get_capacity_policy(self) -> str:
+        """
+        Return name of the capacity policy
+        """
+        return 'power_of_two' if self._power_of_two else 'prime'
+
+    def get_load_policy(self) -> LoadPolicy:
+        """
+        Return the load policy, with the map's defaults filled in
+        """
+        return self._policy
+
+    def is_resizing(self) -> bool:
+        """
+        Return True while an incremental resize is still moving chains
+        """
+        return self._old_buckets is not None
+
+    def occupancy(self) -> dict:
+        """
+        Return the size, capacity and load of the map, its occupied and empty buckets,
+        and the mean length of the occupied chains, from counters kept up to date
+        by every change. During an incremental resize the chains not moved yet are
+        counted where they are: occupied covers both tables, empty the current one.
+        """
+        if self._debug:
+            self.check_counters()
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'occupied': self._occupied,
+            'empty': self._capacity - (self._occupied - self._old_occupied),
+            'mean_chain': self._size / self._occupied if self._occupied else 0.0,
+        }
+
+    def check_counters(self) -> None:
+        """
+        Scan the whole table, and the old one of an incremental resize, and raise
+        RuntimeError if the size or occupied bucket counters disagree with them
+        """
+        size = occupied = old_occupied = 0
+        for bucket in self._bucket_list:
+            if bucket is not None and bucket.length() > 0:
+                occupied += 1
+                size += bucket.length()
+        for bucket in self._old_buckets or ():
+            if bucket is not None and bucket.length() > 0:
+                old_occupied += 1
+                size += bucket.length()
+        occupied += old_occupied
+        if (size, occupied, old_occupied) != (self._size, self._occupied, self._old_occupied):
+            raise RuntimeError(f"counters out of sync: size {self._size}, occupied {self._occupied} "
+                               f"({self._old_occupied} old); tables hold {size} keys in {occupied} "
+                               f"buckets ({old_occupied} old)")
+
+    def stats(self) -> dict:
+        """
+        Return the occupancy of the map, plus for an instrumented map
+        the operation counts, mean and longest chain per operation, a histogram of
+        chain lengths in power of two bins, and resize counts and durations
+        """
+        result = self.occupancy()
+        if self._stats is not None:
+            result.update(self._stats.summary())
+        return result
+
+    def _migrating_slot(self, hash: int) -> tuple:
+        """
+        Helper function for an incremental resize in progress: moves the next batch of
+        buckets, then returns (bucket list, index) of the bucket whose chain holds hash.
+        That is the old bucket until it has been moved, the new one afterwards.
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._resize_batch)
+        if self._old_buckets is not None:
+            hash_key = self._home(hash, self._old_capacity)
+            if hash_key >= self._migrate_index:
+                return self._old_buckets, hash_key
+        return self._bucket_list, self._home(hash, self._capacity)
+
+    def _start_resize(self, new_capacity: int, buckets: DynamicArray = None) -> None:
+        """
+        Helper function to swap in new_capacity empty buckets (buckets, if already allocated),
+        keeping the current ones as the old table whose chains are moved over by _migrate.
+        """
+        self._finish_resize()
+        start = time.perf_counter()
+        self._old_buckets, self._old_capacity = self._bucket_list, self._capacity
+        self._old_occupied = self._occupied
+        self._migrate_index = 0
+        self._set_buckets(buckets if buckets is not None else self._new_buckets(new_capacity))
+        self._capacity = new_capacity
+        self._version += 1
+
+        if self._stats is not None:
+            self._stats.record_resize('resize', self._old_capacity, new_capacity, self._size,
+                                      time.perf_counter() - start)
+
+    def _migrate(self, count: int) -> None:
+        """
+        Helper function to relink the chains of the next count old buckets into the
+        current table. Drops the old table once its last bucket has been moved.
+        """
+        old_buckets = self._old_buckets
+        start = self._migrate_index
+        end = min(start + count, self._old_capacity)
+
+        for index in range(start, end):
+            bucket = old_buckets[index]
+            if bucket is not None:
+                old_buckets[index] = None
+                if bucket.length() > 0:
+                    self._occupied -= 1
+                    self._old_occupied -= 1
+                self._relink(bucket)
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+        else:
+            self._migrate_index = end
+
+    def _finish_resize(self) -> None:
+        """Helper function to move every remaining chain of an incremental resize at once."""
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
+
+    def _relink(self, bucket: LinkedList) -> None:
+        """
+        Helper function to move the nodes of bucket into the current table using their
+        cached hash; the hash function is not called again. Counts the buckets that
+        stop being empty.
+        """
+        buckets, home, capacity = self._bucket_list, self._home, self._capacity
+        # the list iterator advances before yielding, so each node can be relinked right away
+        for node in bucket:
+            hash_key = home(node.hash, capacity)
+            target = buckets[hash_key]
+            if target is None:
+                target = buckets[hash_key] = LinkedList()
+            if target.length() == 0:
+                self._occupied += 1
+            target.insert_node(node)
+
     # ------------------------------------------------------------------ #
 
-    def put(self, key: str, value: object) -> None:
+    def _find_for_update(self, key: str, hash: int = None) -> tuple:
         """
-        Adds the key:value pair to the hash map. If the key already exists then it's value will be replaced.
-        Updates capacity if needed.
+        Helper function for the operations that may add key: resizes if needed, hashes
+        key once (unless its hash is passed in) and walks its chain. Returns (bucket, hash, node holding key or None);
+        a lazy bucket is allocated so a new node can be inserted right away.
         """
         # check if resize is needed
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        if self.table_load() >= self._max_load:
+            if self._incremental:
+                self._start_resize(self._valid_capacity(self._policy.grown(self._capacity)))
+            else:
+                self.resize_table(self._policy.grown(self._capacity))
 
         # find index for the key
-        hash_key = self._hash_function(key)
-        hash_key %= self._capacity
+        if hash is None:
+            hash = self._hash_function(key)
+        if self._old_buckets is None:
+            buckets, hash_key = self._bucket_list, self._home(hash, self._capacity)
+        else:
+            buckets, hash_key = self._migrating_slot(hash)
 
         # find bucket at corresponding index
-        bucket = self._buckets[hash_key]
-        # check if bucket already contains the key
-        duplicate = bucket.contains(key)
+        bucket = buckets[hash_key]
+        if bucket is None:
+            bucket = buckets[hash_key] = LinkedList()
+        if self._stats is not None:
+            self._stats.record('put', bucket.length(), key)
+        return bucket, hash, bucket.contains(key, hash)
+
+    def _occupy(self, bucket: LinkedList, hash: int) -> None:
+        """Helper function counting an empty bucket, about to get a node of hash, as occupied."""
+        self._occupied += 1
+        old_buckets = self._old_buckets
+        if old_buckets is not None and bucket is old_buckets[self._home(hash, self._old_capacity)]:
+            self._old_occupied += 1
+
+    def _store_new(self, bucket: LinkedList, hash: int, key: str, value: object) -> None:
+        """
+        Helper function to add a key that _find_for_update did not find to the bucket it returned
+        """
+        if bucket.length() == 0:
+            self._occupy(bucket, hash)
+        bucket.insert(key, value, hash)
+        self._size += 1
+        self._version += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds the key:value pair to the hash map. If the key already exists then it's value will be replaced.
+        Updates capacity if needed.
+        """
+        bucket, hash, duplicate = self._find_for_update(key)
 
         # check if key exists. Replace value
         if duplicate is not None:
             duplicate.value = value
         else:
-            bucket.insert(key, value)
-            self._size += 1
+            self._store_new(bucket, hash, key, value)
 
-    def empty_buckets(self) -> int:
+    def setdefault(self, key: str, default: object = None) -> object:
         """
-        Returns the number of empty buckets in the hash table.
+        Returns the value of key. If key is not in the hash map, adds it with
+        the default value first.
+        """
+        bucket, hash, node = self._find_for_update(key)
+        if node is not None:
+            return node.value
+        self._store_new(bucket, hash, key, default)
+        return default
+
+    def upsert(self, key: str, function: callable, default: object = None) -> object:
         """
-        empty_count = 0
+        Replaces the value of key with function(value), adding key with function(default)
+        if it is not in the hash map. Returns the new value.
+        function must not modify the hash map.
+        """
+        bucket, hash, node = self._find_for_update(key)
+        if node is not None:
+            node.value = function(node.value)
+            return node.value
+        value = function(default)
+        self._store_new(bucket, hash, key, value)
+        return value
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value of key, starting from 0 if key is not in the hash map.
+        The key is hashed and its chain walked once. Returns the new value.
+        """
+        bucket, hash, node = self._find_for_update(key)
+        if node is not None:
+            node.value += delta
+            return node.value
+        self._store_new(bucket, hash, key, delta)
+        return delta
+
+    def put_many(self, pairs, expected_size: int = None) -> None:
+        """
+        Adds every key:value pair from an iterable of pairs. The table is sized once,
+        up front, for expected_size new keys (the number of pairs by default),
+        so no resizes happen while the pairs are inserted. Keys are hashed a batch
+        at a time when the hash function has a vectorized version in bulk_hash.
+        """
+        pairs, expected_size = sized_pairs(pairs, expected_size)
 
-        for index in range(self._buckets.length()):
-            if self._buckets[index].length() == 0:
-                empty_count += 1
+        # smallest capacity that keeps the load under max_load until the last put
+        capacity = self._policy.capacity_for(self._size + expected_size)
+        if capacity > self._capacity:
+            self.resize_table(capacity)
 
-        return empty_count
+        if not vectorized(self._hash_function):
+            put = self.put
+            for key, value in pairs:
+                put(key, value)
+            return
+
+        find, store_new = self._find_for_update, self._store_new
+        for batch in batched(pairs, LOAD_BATCH):
+            hashes = hash_many(self._hash_function, [key for key, _ in batch])
+            for (key, value), hash in zip(batch, hashes):
+                # the same steps as put, with the hash already computed
+                bucket, hash, node = find(key, hash)
+                if node is not None:
+                    node.value = value
+                else:
+                    store_new(bucket, hash, key, value)
+
+    @classmethod
+    def from_pairs(cls, pairs, function: callable = hash_function_1,
+                   expected_size: int = None, **kwargs) -> "HashMap":
+        """
+        Build a new HashMap from an iterable of key:value pairs in a single pass.
+        Other keyword arguments are passed on to the constructor.
+        """
+        pairs, expected_size = sized_pairs(pairs, expected_size)
+        hash_map = cls(1, function, **kwargs)
+        hash_map.put_many(pairs, expected_size)
+        return hash_map
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        During an incremental resize, those of the current table.
+        """
+        if self._debug:
+            self.check_counters()
+        return self._capacity - (self._occupied - self._old_occupied)
 
     def table_load(self) -> float:
         """
@@ -123,10 +514,12 @@ class HashMap:
         """
         Clears the contents of the hash map. Keeps capacity.
         """
-        self._buckets = DynamicArray()
-        for index in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._set_buckets(self._new_buckets(self._capacity))
+        self._old_buckets = None
         self._size = 0
+        self._occupied = 0
+        self._old_occupied = 0
+        self._version += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -135,6 +528,60 @@ class HashMap:
         """
         if 1 > new_capacity:
             return
+        new_capacity = self._valid_capacity(new_capacity)
+
+        self._finish_resize()
+        start = time.perf_counter()
+        old_buckets, old_capacity = self._bucket_list, self._capacity
+        self._set_buckets(self._new_buckets(new_capacity))
+        self._capacity = new_capacity
+        self._occupied = 0
+        self._version += 1
+
+        for bucket in old_buckets:
+            if bucket is not None:
+                self._relink(bucket)
+
+        if self._stats is not None:
+            self._stats.record_resize('resize', old_capacity, new_capacity, self._size,
+                                      time.perf_counter() - start)
+
+    def _rebuilt(self, new_capacity: int) -> tuple:
+        """
+        Helper function returning a table of new_capacity buckets holding copies of the
+        nodes, for _install. Unlike resize_table it leaves the current chains alone,
+        so it may run in another thread while the map is read but not changed.
+        """
+        buckets = self._new_buckets(new_capacity)
+        bucket_list, home = buckets.raw(), self._home
+        occupied = 0
+        for bucket in self._bucket_list:
+            if bucket is None:
+                continue
+            for node in bucket:
+                hash_key = home(node.hash, new_capacity)
+                target = bucket_list[hash_key]
+                if target is None:
+                    target = bucket_list[hash_key] = LinkedList()
+                if target.length() == 0:
+                    occupied += 1
+                target.insert(node.key, node.value, node.hash)
+        return buckets, new_capacity, occupied
+
+    def _install(self, table: tuple) -> None:
+        """Helper function to swap in a table built by _rebuilt from the current entries."""
+        buckets, self._capacity, self._occupied = table
+        self._set_buckets(buckets)
+        self._version += 1
+
+    def _valid_capacity(self, new_capacity: int) -> int:
+        """
+        Helper function returning the capacity a resize to new_capacity ends up with
+        """
+        if self._power_of_two:
+            # new capacity must be a power of two no smaller than the current size
+            return next_power_of_two(max(new_capacity, self._size))
+
         # capacity must be a prime number
         if self._is_prime(new_capacity) is False:
             new_capacity = self._next_prime(new_capacity)
@@ -144,26 +591,7 @@ class HashMap:
             new_capacity *= 2
             new_capacity = self._next_prime(new_capacity)
 
-        # temporary hash map with new capacity
-        temp_map = HashMap(new_capacity, self._hash_function)
-        # _next_prime method does not consider 2 a prime, and cannot edit _next_prime
-        if temp_map.get_capacity() == 3 and new_capacity == 2:
-            temp_map.set_capacity(2)
-
-        # iterate over the buckets of the current hash map
-        for index in range(self._capacity):
-            bucket = self._buckets[index]
-            for node in bucket:
-                # insert key:value pairs into temp map
-                temp_map.put(node.key, node.value)
-
-        # update actual map with new capacity and empty buckets
-        self._capacity = temp_map.get_capacity()
-        self._buckets = DynamicArray()
-
-        # iterate over the buckets of temp map and insert into the actual map
-        for index in range(temp_map.get_capacity()):
-            self._buckets.append(temp_map.get_buckets()[index])
+        return new_capacity
 
     def get(self, key: str):
         """
@@ -171,11 +599,18 @@ class HashMap:
         in the hash map.
         """
         # find index the key would be at
-        hash_key = self._hash_function(key)
-        hash_key %= self._capacity
-
-        for node in self._buckets[hash_key]:
-            if node.key == key:
+        hash = self._hash_function(key)
+        if self._old_buckets is None:
+            buckets, hash_key = self._bucket_list, self._home(hash, self._capacity)
+        else:
+            buckets, hash_key = self._migrating_slot(hash)
+
+        bucket = buckets[hash_key]
+        if self._stats is not None:
+            self._stats.record('get', bucket.length() if bucket is not None else 0, key)
+        if bucket is not None:
+            node = bucket.contains(key, hash)
+            if node is not None:
                 return node.value
 
         return None
@@ -185,39 +620,133 @@ class HashMap:
         Returns true if the key is in the hash map.
         """
         # find index the key would be at
-        hash_key = self._hash_function(key)
-        hash_key %= self._capacity
+        hash = self._hash_function(key)
+        if self._old_buckets is None:
+            buckets, hash_key = self._bucket_list, self._home(hash, self._capacity)
+        else:
+            buckets, hash_key = self._migrating_slot(hash)
+
+        bucket = buckets[hash_key]
+        if self._stats is not None:
+            self._stats.record('get', bucket.length() if bucket is not None else 0, key)
+        return bucket is not None and bucket.contains(key, hash) is not None
 
-        for node in self._buckets[hash_key]:
-            if node.key == key:
-                return True
+    def _find_many(self, keys: list) -> list:
+        """
+        Helper function returning the node holding every key in keys, or None if absent.
+        With a hash function bulk_hash can vectorize, the whole batch is hashed and
+        assigned buckets first; otherwise each key is hashed as its chain is walked.
+        """
+        function, stats = self._hash_function, self._stats
+        if self._old_buckets is not None or stats is not None:
+            # while resizing, look the keys up one by one, moving buckets as get would;
+            # instrumented maps do the same so each lookup is recorded
+            result = []
+            for key, hash in zip(keys, hash_many(function, keys)):
+                buckets, hash_key = self._migrating_slot(hash)
+                bucket = buckets[hash_key]
+                if stats is not None:
+                    stats.record('get', bucket.length() if bucket is not None else 0, key)
+                result.append(bucket.contains(key, hash) if bucket is not None else None)
+            return result
+
+        buckets, capacity = self._bucket_list, self._capacity
+        result = []
+        append = result.append
+        if not vectorized(function):
+            # hashing up front would only add a pass over the batch
+            home = self._home
+            for key in keys:
+                hash = function(key)
+                bucket = buckets[home(hash, capacity)]
+                append(bucket.contains(key, hash) if bucket is not None else None)
+            return result
+
+        hashes = hash_many(function, keys)
+        homes = bucket_indices(hashes, capacity, self._power_of_two)
+        for key, hash, hash_key in zip(keys, hashes, homes):
+            bucket = buckets[hash_key]
+            append(bucket.contains(key, hash) if bucket is not None else None)
+        return result
 
-        return False
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Returns an array with the value of every key in keys, in order,
+        using default for keys that are not in the hash map
+        """
+        return DynamicArray([node.value if node is not None else default
+                             for node in self._find_many(as_list(keys))])
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Returns an array telling, in order, whether each key in keys is in the hash map
+        """
+        return DynamicArray([node is not None for node in self._find_many(as_list(keys))])
 
     def remove(self, key: str) -> None:
         """
         Receives a key and removes the key:value pair from the hash map if it exists.
         """
-        # find index the key would be at
-        hash_key = self._hash_function(key)
-        hash_key %= self._capacity
+        self._remove(key, self._hash_function(key))
 
-        for node in self._buckets[hash_key]:
-            if node.key == key:
-                self._buckets[hash_key].remove(key)
-                self._size -= 1
+    def _remove(self, key: str, hash: int) -> object:
+        """
+        Helper function removing key, whose hash is already known, from the hash map.
+        Returns the node that held key, or None if it was absent.
+        """
+        # find index the key would be at
+        if self._old_buckets is None:
+            buckets, hash_key = self._bucket_list, self._home(hash, self._capacity)
+        else:
+            buckets, hash_key = self._migrating_slot(hash)
+
+        bucket = buckets[hash_key]
+        if self._stats is not None:
+            self._stats.record('remove', bucket.length() if bucket is not None else 0, key)
+        node = bucket.pop(key, hash) if bucket is not None else None
+        if node is not None:
+            self._size -= 1
+            self._version += 1
+            if bucket.length() == 0:
+                self._occupied -= 1
+                if buckets is self._old_buckets:
+                    self._old_occupied -= 1
+                # lazy buckets go back to None once they are empty
+                if self._lazy_buckets:
+                    buckets[hash_key] = None
+            if self._policy.shrink:
+                self._shrink_if_needed()
+        return node
+
+    def _shrink_if_needed(self) -> None:
+        """
+        Helper function to shrink the table once the load drops under the policy's
+        min_load, down to no less than the capacity the map started with
+        """
+        if self.table_load() >= self._policy.min_load or self._capacity <= self._min_capacity:
+            return
+        new_capacity = max(self._policy.shrunk(self._capacity), self._min_capacity)
+        if self._incremental:
+            self._start_resize(self._valid_capacity(new_capacity))
+        else:
+            self.resize_table(new_capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns an unordered dynamic array where each index contains a tuple of key:value pairs
         stored in the hash map.
         """
-        result = DynamicArray()
-
-        for index in range(self._capacity):
-            for node in self._buckets[index]:
+        self._finish_resize()
+        return DynamicArray(self._items_in(0, self._capacity))
+
+    def _items_in(self, start: int, end: int) -> list:
+        """Helper function returning the (key, value) pairs of the chains in buckets start to end - 1"""
+        result = []
+        for bucket in self._bucket_list[start:end]:
+            if bucket is None:
+                continue
+            for node in bucket:
                 result.append((node.key, node.value))
-
         return result
 
     def set_capacity(self, capacity: int) -> None:
@@ -225,9 +754,32 @@ class HashMap:
         self._capacity = capacity
 
     def get_buckets(self) -> DynamicArray:
-        """Returns buckets in the hash map"""
+        """Returns buckets in the hash map (None for unused buckets with lazy_buckets)"""
+        self._finish_resize()
         return self._buckets
 
+    def _iterator(self, kind: str) -> HashMapIterator:
+        """Helper function returning a new iterator of the given kind, used by the views"""
+        return HashMapIterator(self, kind)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Create iterator over the nodes of the map
+        """
+        return HashMapIterator(self)
+
+    def keys(self) -> KeysView:
+        """Returns a lazy view of the keys in the hash map"""
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """Returns a lazy view of the values in the hash map"""
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """Returns a lazy view of the key:value pairs in the hash map"""
+        return ItemsView(self)
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
@@ -235,28 +787,23 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
     # create a hash map for the array
     map = HashMap(da.length(), hash_function_1)
-    mode = DynamicArray()
+    mode = []
     freq = 0
 
-    # loop through array and check if hash map already contains the key. If so, inc value by 1
+    # count each key with a single lookup
     for index in range(da.length()):
         key = da[index]
-        if map.contains_key(key):
-            value = map.get(key) + 1
-        else:
-            value = 1
-        # add key value pair to the hash map
-        map.put(key, value)
-        # if value is greater than max freq, replace the mode
+        value = map.increment(key)
+        # if value is greater than max freq, start the modes over
         if value > freq:
-            mode = DynamicArray()
+            mode.clear()
             mode.append(key)
             freq = value
         # if value is equal to max freq, add an additional mode
         elif value == freq:
             mode.append(key)
 
-    return tuple((mode, freq))
+    return tuple((DynamicArray(mode), freq))
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
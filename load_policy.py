@@ -0,0 +1,72 @@
+# Description: Load factor and growth policy shared by both HashMaps.
+
+
+class LoadPolicy:
+    """
+    When a HashMap grows or shrinks its table, passed as the load_policy argument.
+    max_load        load factor at which a put grows the table; None uses the map's
+                    default (0.5 for open addressing, 1.0 for separate chaining)
+    growth_factor   capacity multiplier used when growing; shrinking divides by it
+    shrink          shrink the table after a remove once the load drops under min_load,
+                    never below the capacity the map was created with
+    min_load        load factor that triggers shrinking; None uses max_load / growth_factor^2,
+                    which leaves a shrunk table half way between the two limits
+    initial_size    number of keys to size the table for when the map is created
+    """
+
+    __slots__ = ('max_load', 'growth_factor', 'shrink', 'min_load', 'initial_size')
+
+    def __init__(self, max_load: float = None, growth_factor: float = 2.0, shrink: bool = False,
+                 min_load: float = None, initial_size: int = None) -> None:
+        """Initialize the policy, checking the values that do not depend on the map."""
+        if max_load is not None and max_load <= 0:
+            raise ValueError("max_load must be positive")
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be above 1")
+        if min_load is not None and min_load < 0:
+            raise ValueError("min_load must not be negative")
+        if initial_size is not None and initial_size < 0:
+            raise ValueError("initial_size must not be negative")
+        self.max_load = max_load
+        self.growth_factor = growth_factor
+        self.shrink = shrink
+        self.min_load = min_load
+        self.initial_size = initial_size
+
+    def __repr__(self) -> str:
+        """Return the policy as a constructor call."""
+        return (f"LoadPolicy(max_load={self.max_load}, growth_factor={self.growth_factor}, "
+                f"shrink={self.shrink}, min_load={self.min_load}, initial_size={self.initial_size})")
+
+    def resolve(self, default_max_load: float, max_load_limit: float = None) -> "LoadPolicy":
+        """
+        Return a copy with max_load and min_load filled in for a map whose default
+        max_load is default_max_load and whose load must stay under max_load_limit
+        """
+        max_load = self.max_load if self.max_load is not None else default_max_load
+        if max_load_limit is not None and max_load >= max_load_limit:
+            raise ValueError(f"max_load must be under {max_load_limit}")
+        min_load = self.min_load if self.min_load is not None else max_load / self.growth_factor ** 2
+        # a shrunk table must come out under max_load, or it would grow straight back
+        if min_load * self.growth_factor >= max_load:
+            raise ValueError("min_load * growth_factor must be under max_load")
+        return LoadPolicy(max_load, self.growth_factor, self.shrink, min_load, self.initial_size)
+
+    def capacity_for(self, size: int) -> int:
+        """
+        Return the smallest capacity that takes size keys without growing:
+        the load before the last put stays under max_load
+        """
+        return int((size - 1) / self.max_load) + 1 if size > 0 else 1
+
+    def grown(self, capacity: int) -> int:
+        """Return the capacity to grow a table of capacity buckets to, before any rounding."""
+        return max(int(capacity * self.growth_factor), capacity + 1)
+
+    def shrunk(self, capacity: int) -> int:
+        """Return the capacity to shrink a table of capacity buckets to, before any rounding."""
+        return max(int(capacity / self.growth_factor), 1)
+
+    def to_dict(self) -> dict:
+        """Return the policy as a dict of its constructor arguments."""
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,83 @@
+# Description: Opt-in operation statistics kept by both HashMaps.
+
+
+class MapStats:
+    """
+    Statistics of a HashMap created with instrument=True, or with a MapStats instance
+    to install a hook. Recording an operation costs a few counter updates.
+    For the OA map an operation's probe count is the number of buckets examined;
+    for the SC map it is the length of the chain the key hashes to.
+    hook(event, info) is called after every resize and compaction ('resize',
+    'compact'), and after every operation whose probe count reaches probe_alert
+    ('long_probe'), so pathological key distributions show up as they happen.
+    """
+
+    __slots__ = ('probes', 'operations', 'total_probes', 'max_probes', 'histogram',
+                 'resizes', 'compactions', 'resize_seconds', 'max_resize_seconds',
+                 'hook', 'probe_alert')
+
+    def __init__(self, hook: callable = None, probe_alert: int = None) -> None:
+        """Initialize empty statistics with an optional hook."""
+        self.hook = hook
+        self.probe_alert = probe_alert
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every counter, keeping the hook."""
+        # running count of buckets probed, advanced by the probing code
+        self.probes = 0
+        # operation name: number of operations, and their total probes
+        self.operations = {}
+        self.total_probes = {}
+        self.max_probes = 0
+        # histogram[i] counts operations whose probe count has bit length i: 0, 1, 2-3, 4-7, ...
+        self.histogram = []
+        self.resizes = 0
+        self.compactions = 0
+        self.resize_seconds = 0.0
+        self.max_resize_seconds = 0.0
+
+    def record(self, operation: str, probes: int, key: object = None) -> None:
+        """Record one operation and how many probes it took."""
+        self.operations[operation] = self.operations.get(operation, 0) + 1
+        self.total_probes[operation] = self.total_probes.get(operation, 0) + probes
+        if probes > self.max_probes:
+            self.max_probes = probes
+
+        histogram, index = self.histogram, probes.bit_length()
+        if index >= len(histogram):
+            histogram.extend([0] * (index + 1 - len(histogram)))
+        histogram[index] += 1
+
+        if self.probe_alert is not None and probes >= self.probe_alert and self.hook is not None:
+            self.hook('long_probe', {'operation': operation, 'probes': probes, 'key': key})
+
+    def record_resize(self, event: str, old_capacity: int, new_capacity: int,
+                      size: int, seconds: float) -> None:
+        """Record a resize or compaction ('resize' or 'compact') and how long it took."""
+        if event == 'compact':
+            self.compactions += 1
+        else:
+            self.resizes += 1
+        self.resize_seconds += seconds
+        if seconds > self.max_resize_seconds:
+            self.max_resize_seconds = seconds
+
+        if self.hook is not None:
+            self.hook(event, {'old_capacity': old_capacity, 'new_capacity': new_capacity,
+                              'size': size, 'seconds': seconds})
+
+    def summary(self) -> dict:
+        """Return the statistics as a dict of plain values."""
+        return {
+            'operations': dict(self.operations),
+            'mean_probes': {operation: self.total_probes[operation] / count
+                            for operation, count in self.operations.items()},
+            'max_probes': self.max_probes,
+            'probe_histogram': {(0 if index == 0 else 1 << index - 1): count
+                                for index, count in enumerate(self.histogram) if count},
+            'resizes': self.resizes,
+            'compactions': self.compactions,
+            'resize_seconds': self.resize_seconds,
+            'max_resize_seconds': self.max_resize_seconds,
+        }
@@ -0,0 +1,202 @@
+# Description: Binary snapshot file format for the open addressing HashMap.
+
+import json
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+from DS_include import DynamicArray, HashEntry, EMPTY, TOMBSTONE
+
+MAGIC = b'OAHMSNAP'
+FORMAT_VERSION = 1
+
+# first byte of every encoded key and value
+_STR = ord('s')
+_BYTES = ord('b')
+_PICKLE = ord('p')
+
+SECTIONS = ('hashes', 'key_offsets', 'value_offsets', 'keys', 'values')
+
+
+def encode_object(obj: object) -> bytes:
+    """
+    Encode a key or value: str as UTF-8 and bytes as they are, anything else pickled
+    """
+    if type(obj) is str:
+        return b's' + obj.encode()
+    if type(obj) is bytes:
+        return b'b' + obj
+    return b'p' + pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def decode_object(data) -> object:
+    """
+    Decode a key or value written by encode_object from a bytes-like object.
+    Pickled objects are unpickled, which can run arbitrary code: only decode trusted data.
+    """
+    tag = data[0]
+    if tag == _STR:
+        return str(data[1:], 'utf-8')
+    if tag == _BYTES:
+        return bytes(data[1:])
+    if tag == _PICKLE:
+        return pickle.loads(data[1:])
+    raise ValueError(f"unknown snapshot object tag {tag!r}")
+
+
+def _padding(length: int) -> bytes:
+    """Return the zero bytes that bring length up to a multiple of 8"""
+    return bytes(-length % 8)
+
+
+def write_snapshot(path: str, storage, metadata: dict) -> None:
+    """
+    Write the bucket layout of an open addressing storage and the map's metadata to path.
+    The file holds MAGIC, the length of a JSON header as a little endian uint32,
+    the header, and then these sections, each starting on a multiple of 8 bytes:
+    hashes          int64 per bucket, EMPTY and TOMBSTONE sentinels included
+    key_offsets     uint64 per bucket plus one; the key of bucket i is
+                    keys[key_offsets[i]:key_offsets[i + 1]]
+    value_offsets   the same for values
+    keys, values    the encoded keys and values of the live buckets
+    Integers use the writing machine's byte order, which the header records.
+    """
+    capacity = storage.length()
+    hashes = array('q', [EMPTY]) * capacity
+    key_offsets = array('Q', [0]) * (capacity + 1)
+    value_offsets = array('Q', [0]) * (capacity + 1)
+    keys, values = bytearray(), bytearray()
+
+    for index in range(capacity):
+        hash = storage.hash_at(index)
+        hashes[index] = hash
+        if hash >= 0:
+            keys += encode_object(storage.key_at(index))
+            values += encode_object(storage.value_at(index))
+        key_offsets[index + 1] = len(keys)
+        value_offsets[index + 1] = len(values)
+
+    data = (hashes.tobytes(), key_offsets.tobytes(), value_offsets.tobytes(), bytes(keys), bytes(values))
+
+    # section offsets are relative to the end of the padded header
+    sections, offset = {}, 0
+    for name, section in zip(SECTIONS, data):
+        sections[name] = [offset, len(section)]
+        offset += len(section) + len(_padding(len(section)))
+
+    header = dict(metadata, format=FORMAT_VERSION, byteorder=sys.byteorder,
+                  capacity=capacity, sections=sections)
+    header = json.dumps(header).encode()
+
+    with open(path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<I', len(header)))
+        file.write(header)
+        file.write(_padding(len(MAGIC) + 4 + len(header)))
+        for section in data:
+            file.write(section)
+            file.write(_padding(len(section)))
+
+
+def read_snapshot(path: str, mapped: bool = False) -> tuple:
+    """
+    Open a snapshot written by write_snapshot. Returns (header, MappedStorage).
+    With mapped the file is memory mapped instead of read into memory,
+    so opening it costs the same whatever its size. Keys and values that are neither
+    str nor bytes are unpickled when read, so only open files from a trusted source.
+    """
+    with open(path, 'rb') as file:
+        if mapped:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = file.read()
+
+    view = memoryview(buffer)
+    try:
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a hash map snapshot")
+        header_length = struct.unpack_from('<I', view, len(MAGIC))[0]
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_length]))
+        if header['format'] != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {header['format']}")
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f"snapshot was written on a {header['byteorder']} endian machine")
+    except BaseException:
+        view.release()
+        if mapped:
+            buffer.close()
+        raise
+
+    data_start = start + header_length + len(_padding(start + header_length))
+    sections = {}
+    for name in SECTIONS:
+        offset, length = header['sections'][name]
+        sections[name] = view[data_start + offset:data_start + offset + length]
+    return header, MappedStorage(buffer, view, sections)
+
+
+class MappedStorage:
+    """
+    Read-only open addressing bucket storage over the sections of a snapshot.
+    Hashes and offsets are read straight from the buffer and keys and values are
+    decoded only when accessed, so nothing is deserialized up front.
+    Supported methods are the read methods of EntryStorage:
+    hash_at, key_at, value_at, entry_at, get_buckets, length, and close
+    """
+
+    __slots__ = ('_buffer', '_views', '_hashes', '_key_offsets', '_value_offsets', '_keys', '_values')
+
+    def __init__(self, buffer, view: memoryview, sections: dict) -> None:
+        """Initialize over the sections of buffer, a bytes or mmap object."""
+        self._buffer = buffer
+        self._hashes = sections['hashes'].cast('q')
+        self._key_offsets = sections['key_offsets'].cast('Q')
+        self._value_offsets = sections['value_offsets'].cast('Q')
+        self._keys = sections['keys']
+        self._values = sections['values']
+        # every view has to be released before an mmap can be closed
+        self._views = [view, *sections.values(), self._hashes, self._key_offsets, self._value_offsets]
+
+    def hash_at(self, index: int) -> int:
+        """Return the hash stored at index, or EMPTY / TOMBSTONE."""
+        return self._hashes[index]
+
+    def key_at(self, index: int) -> object:
+        """Return the key stored at index."""
+        offsets = self._key_offsets
+        return decode_object(self._keys[offsets[index]:offsets[index + 1]])
+
+    def value_at(self, index: int) -> object:
+        """Return the value stored at index."""
+        offsets = self._value_offsets
+        return decode_object(self._values[offsets[index]:offsets[index + 1]])
+
+    def entry_at(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of the bucket at index, or None if it is empty."""
+        hash = self._hashes[index]
+        if hash == EMPTY:
+            return None
+        if hash == TOMBSTONE:
+            entry = HashEntry(None, None, hash)
+            entry.is_tombstone = True
+            return entry
+        return HashEntry(self.key_at(index), self.value_at(index), hash)
+
+    def get_buckets(self) -> DynamicArray:
+        """Return a DynamicArray of HashEntry copies of the buckets."""
+        return DynamicArray([self.entry_at(index) for index in range(len(self._hashes))])
+
+    def length(self) -> int:
+        """Return the number of buckets."""
+        return len(self._hashes)
+
+    def close(self) -> None:
+        """Release the buffer, unmapping the file if it was memory mapped."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
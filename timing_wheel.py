@@ -0,0 +1,149 @@
+# Description: Hierarchical timing wheel scheduling deadlines in amortized O(1).
+
+import math
+
+
+class Timer:
+    """
+    A deadline scheduled on a TimingWheel for key.
+    tick is the wheel tick its deadline falls in; slot and level locate it on the wheel.
+    """
+
+    __slots__ = ('key', 'deadline', 'tick', 'slot', 'level')
+
+    def __init__(self, key: object, deadline: float, tick: int) -> None:
+        """Initialize a timer that is not on a wheel yet."""
+        self.key = key
+        self.deadline = deadline
+        self.tick = tick
+        self.slot = None
+        self.level = None
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel: levels wheels of slots slots each. A slot of level 0
+    spans one tick of tick_length seconds, a slot of level l spans slots^l ticks.
+    A timer sits on the lowest level whose current rotation holds its tick, and is
+    moved down a level each time the wheel below wraps around to its slot, so it is
+    moved at most levels times before it fires. Timers further ahead than the whole
+    wheel wait on an overflow slot that is sorted out every top level rotation.
+    Scheduling and cancelling are O(1); advancing skips over runs of empty ticks.
+    """
+
+    def __init__(self, tick_length: float = 1.0, slots: int = 64, levels: int = 4,
+                 start: float = 0.0) -> None:
+        """Initialize an empty wheel whose clock reads start."""
+        if tick_length <= 0:
+            raise ValueError("tick_length must be positive")
+        if slots < 2:
+            raise ValueError("slots must be at least 2")
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+        self._tick_length = tick_length
+        self._slots = slots
+        self._levels = levels
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        # timers per level, so empty levels can be skipped over
+        self._counts = [0] * levels
+        self._overflow = set()
+        self._size = 0
+        # tick the clock is in; earlier ticks have been processed
+        self._current = math.floor(start / tick_length)
+
+    def __len__(self) -> int:
+        """Return the number of scheduled timers."""
+        return self._size
+
+    def schedule(self, key: object, deadline: float) -> Timer:
+        """
+        Schedule a timer for key at deadline, in the same units as the clock readings
+        passed to advance. Returns the timer, which can be passed to cancel.
+        """
+        timer = Timer(key, deadline, max(math.floor(deadline / self._tick_length), self._current))
+        self._place(timer)
+        self._size += 1
+        return timer
+
+    def cancel(self, timer: Timer) -> None:
+        """Take a scheduled timer off the wheel; timers that fired or were cancelled are ignored."""
+        if timer.slot is None:
+            return
+        self._unplace(timer)
+        self._size -= 1
+
+    def _place(self, timer: Timer) -> None:
+        """Helper function to put timer on the lowest level whose current rotation holds its tick."""
+        tick, current, slots = timer.tick, self._current, self._slots
+        span = 1
+        for level in range(self._levels):
+            if tick // (span * slots) == current // (span * slots):
+                slot = self._wheels[level][tick // span % slots]
+                self._counts[level] += 1
+                break
+            span *= slots
+        else:
+            slot, level = self._overflow, None
+
+        slot.add(timer)
+        timer.slot, timer.level = slot, level
+
+    def _unplace(self, timer: Timer) -> None:
+        """Helper function to take timer out of its slot."""
+        timer.slot.discard(timer)
+        if timer.level is not None:
+            self._counts[timer.level] -= 1
+        timer.slot = timer.level = None
+
+    def _cascade(self, slot: set) -> None:
+        """Helper function to move the timers of a higher level slot down to where they now belong."""
+        for timer in list(slot):
+            self._unplace(timer)
+            self._place(timer)
+
+    def _fire(self, slot: set, now: float, due: list) -> None:
+        """Helper function to take the timers of a level 0 slot whose deadline has passed off the wheel."""
+        for timer in [timer for timer in slot if timer.deadline <= now]:
+            self._unplace(timer)
+            due.append(timer)
+            self._size -= 1
+
+    def advance(self, now: float) -> list:
+        """
+        Move the wheel's clock forward to now and return the timers whose deadline
+        has passed, in no particular order. They are no longer scheduled.
+        """
+        target = math.floor(now / self._tick_length)
+        slots, levels, counts = self._slots, self._levels, self._counts
+        due = []
+
+        # the current tick may have been partly over at the last call
+        tick = self._current
+        self._fire(self._wheels[0][tick % slots], now, due)
+
+        while tick < target:
+            # jump over ticks that cannot hold a timer: up to the next rotation of the
+            # lowest level that has any, or straight to now if the wheel is empty
+            span, next_tick = 1, tick + 1
+            for level in range(levels):
+                if counts[level]:
+                    break
+                span *= slots
+                next_tick = (tick // span + 1) * span
+            else:
+                if not self._overflow:
+                    next_tick = target
+            tick = self._current = min(next_tick, target)
+
+            # move timers down from every level that wraps around at this tick, highest first
+            if tick % slots == 0:
+                spans = [slots ** level for level in range(1, levels + 1)]
+                if tick % spans[-1] == 0 and self._overflow:
+                    self._cascade(self._overflow)
+                for level in range(levels - 1, 0, -1):
+                    if tick % spans[level - 1] == 0 and counts[level]:
+                        self._cascade(self._wheels[level][tick // spans[level - 1] % slots])
+
+            self._fire(self._wheels[0][tick % slots], now, due)
+
+        return due